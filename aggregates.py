@@ -0,0 +1,131 @@
+import threading
+from collections import Counter, defaultdict
+from typing import Any, Iterable
+
+from constants import NotionBasePropertyID, NotionDatabasePropertyID
+from settings import IN_TRASH_PROPERTY
+
+DEFAULT_GROUP_BY = (NotionDatabasePropertyID.STATUS, NotionDatabasePropertyID.TEAM, NotionDatabasePropertyID.RESPONSIBLE)
+
+
+class CardAggregator:
+    """
+    Group-by counts and sums over extracted cards, maintained incrementally.
+
+    Cards are loaded once, then every change event (a card created, updated, archived or deleted) is
+    applied with apply() or remove(): the aggregator keeps the groups each card contributes to, so a
+    card moving from one status to another changes two counters and nothing else. counts() and sums()
+    read the counters, in O(groups) instead of re-extracting every card.
+    Multi-valued properties (people, multi-select) count the card in each of their groups, and cards
+    without a value are counted under None. Archived and trashed cards are left out.
+    """
+
+    def __init__(self, group_by: Iterable[Any] = DEFAULT_GROUP_BY, sum_properties: Iterable[Any] = ()):
+        self.group_by = tuple(group_by)
+        self.sum_properties = tuple(sum_properties)
+        self._counts = {prop: Counter() for prop in self.group_by}
+        self._sums = {prop: {sum_prop: defaultdict(float) for sum_prop in self.sum_properties} for prop in self.group_by}
+        self._contributions = {}
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._contributions)
+
+    def load(self, cards: Iterable[Any]):
+        """Applies a batch of cards, e.g. a full sync."""
+        for card in cards:
+            self.apply(card)
+
+    def apply(self, card: Any):
+        """Applies a change event: adds the card, or moves it to its new groups if it was already counted."""
+        page_id = card.get(NotionBasePropertyID.ID)
+        if card.get(NotionBasePropertyID.ARCHIVED) or card.get(IN_TRASH_PROPERTY):
+            self.remove(page_id)
+            return
+        contribution = (
+            {prop: _group_keys(card.get(prop)) for prop in self.group_by},
+            {sum_prop: card.get(sum_prop) or 0 for sum_prop in self.sum_properties},
+        )
+        with self._lock:
+            previous = self._contributions.get(page_id)
+            if previous == contribution:
+                return
+            if previous is not None:
+                self._add(previous, -1)
+            self._add(contribution, 1)
+            self._contributions[page_id] = contribution
+
+    def remove(self, page_id: str):
+        """Applies a deletion event: the card no longer counts in any group."""
+        with self._lock:
+            previous = self._contributions.pop(page_id, None)
+            if previous is not None:
+                self._add(previous, -1)
+
+    def _add(self, contribution: tuple[dict[Any, tuple], dict[Any, float]], sign: int):
+        """Adds (or, with sign -1, subtracts) the contribution of a card to its groups, dropping emptied groups."""
+        groups, values = contribution
+        for prop, keys in groups.items():
+            counts = self._counts[prop]
+            for key in keys:
+                counts[key] += sign
+                for sum_prop, value in values.items():
+                    self._sums[prop][sum_prop][key] += sign * value
+                if counts[key] == 0:
+                    del counts[key]
+                    for sums in self._sums[prop].values():
+                        sums.pop(key, None)
+
+    # Queries
+
+    def counts(self, prop: Any) -> dict[Any, int]:
+        """Returns the number of cards per group of a property."""
+        with self._lock:
+            return dict(self._counts[prop])
+
+    def sums(self, prop: Any, sum_prop: Any) -> dict[Any, float]:
+        """Returns the sum of a number property per group of a property."""
+        with self._lock:
+            return dict(self._sums[prop][sum_prop])
+
+    def summary(self) -> dict[str, Any]:
+        """Returns the counts (and sums) of every grouping property, keyed by property name."""
+        with self._lock:
+            return {
+                "cards": len(self._contributions),
+                **{prop.name: {"counts": dict(self._counts[prop]),
+                               **{f"sum_{sum_prop.name}": dict(sums) for sum_prop, sums in self._sums[prop].items()}}
+                   for prop in self.group_by},
+            }
+
+
+def _group_keys(value: Any) -> tuple:
+    """Returns the groups of a property value: one per item of a list, None when empty."""
+    if type(value) is list:
+        return tuple(dict.fromkeys(value)) or (None,)
+    return (value if value not in ("", None) else None,)
+
+
+# Tests
+
+def test_incremental_aggregates():
+    """Test that applying changed cards gives the same counts as recomputing them."""
+    from constants import DATABASE_ID
+    from notion_manager import NotionPageManager
+
+    page_manager = NotionPageManager(DATABASE_ID)
+    cards = page_manager.extract_data(page_manager.query_database())
+    aggregator = CardAggregator()
+    aggregator.load(cards)
+
+    statuses = list(aggregator.counts(NotionDatabasePropertyID.STATUS))
+    for card in cards[:10]:
+        aggregator.apply({**card, NotionDatabasePropertyID.STATUS: statuses[-1]})
+    recomputed = CardAggregator()
+    recomputed.load({**card, NotionDatabasePropertyID.STATUS: statuses[-1]} if index < 10 else card for index, card in enumerate(cards))
+    assert aggregator.summary() == recomputed.summary()
+    print(aggregator.summary())
+
+
+if __name__ == "__main__":
+    test_incremental_aggregates()
@@ -0,0 +1,213 @@
+import re
+from datetime import date
+from typing import Any, Callable, Iterable, Optional
+
+from constants import NotionBasePropertyID, NotionDatabasePropertyID, NotionDatabasePropertyDisplayName
+from date_index import parse_date, parse_date_range
+from notion_manager import NotionPageManager
+from settings import IN_TRASH_PROPERTY
+
+ERROR = "error"
+WARNING = "warning"
+
+RULE_KEYS = {"required", "optional", "allowed", "pattern", "min_date", "max_date", "severity", "message"}
+
+
+class CardValidator:
+    """
+    Validates extracted Notion cards against a declarative rule schema.
+
+    The schema maps a NotionDatabasePropertyID to a rule dictionary:
+        - required: the property must be present and non-empty (error)
+        - optional: the property should be present, a missing value is only a warning
+        - allowed: iterable of allowed values (e.g. status IDs), checked on every item of list values
+        - pattern: regular expression every string value must fully match
+        - min_date / max_date: ISO dates bounding the start (and end) of date values
+        - severity: 'error' (default) or 'warning' for allowed/pattern/date violations
+        - message: optional custom message prefix
+
+    The schema is compiled once into a list of checks, then applied to extracted pages
+    (see NotionPageManager.extract_data) or to columnar batches (see to_columns).
+    """
+
+    def __init__(self, schema: dict[NotionDatabasePropertyID, dict[str, Any]], reject_archived: bool = True):
+        self.reject_archived = reject_archived
+        self._checks = self._compile(schema)
+
+    # Compilation
+
+    def _compile(self, schema: dict[NotionDatabasePropertyID, dict[str, Any]]) -> list[tuple[NotionDatabasePropertyID, str, Callable[[Any], Optional[str]]]]:
+        """Compiles the rule schema into (property, severity, check) tuples."""
+        checks = []
+        for prop, rule in schema.items():
+            unknown_keys = set(rule) - RULE_KEYS
+            if unknown_keys:
+                raise ValueError(f"Unknown rule keys for {prop.name}: {sorted(unknown_keys)}")
+
+            severity = rule.get('severity', ERROR)
+            if severity not in (ERROR, WARNING):
+                raise ValueError(f"Invalid severity for {prop.name}: {severity}")
+            label = rule.get('message') or _display_name(prop)
+
+            if rule.get('required'):
+                checks.append((prop, ERROR, _compile_presence_check(label)))
+            elif rule.get('optional'):
+                checks.append((prop, WARNING, _compile_presence_check(label)))
+
+            if rule.get('allowed') is not None:
+                checks.append((prop, severity, _compile_allowed_check(label, frozenset(rule['allowed']))))
+            if rule.get('pattern') is not None:
+                checks.append((prop, severity, _compile_pattern_check(label, re.compile(rule['pattern']))))
+            if rule.get('min_date') is not None or rule.get('max_date') is not None:
+                min_date = parse_date(rule['min_date']).date() if rule.get('min_date') else None
+                max_date = parse_date(rule['max_date']).date() if rule.get('max_date') else None
+                checks.append((prop, severity, _compile_date_check(label, min_date, max_date)))
+        return checks
+
+    # Validation
+
+    def validate(self, extracted_data: dict[Any, Any] | list[dict[Any, Any]]) -> list[dict[str, Any]]:
+        """
+        Validates one or several extracted pages.
+        Returns one report per card: {'id': ..., 'errors': [...], 'warnings': [...]}.
+        """
+        if type(extracted_data) is not list:
+            extracted_data = [extracted_data]
+        return self.validate_columns(to_columns(extracted_data))
+
+    def validate_columns(self, columns: dict[Any, list[Any]]) -> list[dict[str, Any]]:
+        """
+        Validates a columnar batch, i.e. a mapping of property to a list of values (one per card).
+        The batch must hold the ID column, and every column one value per card.
+        Checks are pure functions of a value, so each runs once per distinct value of its column (statuses,
+        teams, people and dates repeat across cards), and its result is reused for the other cards.
+        """
+        if NotionBasePropertyID.ID not in columns:
+            raise ValueError("A columnar batch must include the NotionBasePropertyID.ID column.")
+        ids = columns[NotionBasePropertyID.ID]
+        uneven_columns = [getattr(prop, 'name', prop) for prop, values in columns.items() if len(values) != len(ids)]
+        if uneven_columns:
+            raise ValueError(f"Columns without one value per card ({len(ids)} cards): {uneven_columns}")
+        reports = [{"id": card_id, "errors": [], "warnings": []} for card_id in ids]
+
+        if self.reject_archived:
+            for flag, message in ((NotionBasePropertyID.ARCHIVED, "Card is archived"), (IN_TRASH_PROPERTY, "Card is in trash")):
+                for index, value in enumerate(columns.get(flag, ())):
+                    if value:
+                        reports[index]["errors"].append(message)
+
+        missing_column = [None] * len(reports)
+        for prop, severity, check in self._checks:
+            bucket = "errors" if severity == ERROR else "warnings"
+            for index, problem in _check_column(check, columns.get(prop, missing_column)):
+                reports[index][bucket].append(problem)
+        return reports
+
+
+def to_columns(extracted_data: Iterable[dict[Any, Any]], properties: Optional[Iterable[Any]] = None) -> dict[Any, list[Any]]:
+    """
+    Converts extracted pages into a columnar batch (property -> list of values).
+    Defaults to the ID, archive flags and every NotionDatabasePropertyID.
+    """
+    if properties is None:
+        properties = [NotionBasePropertyID.ID, NotionBasePropertyID.ARCHIVED, *filter(None, [IN_TRASH_PROPERTY]), *NotionDatabasePropertyID]
+    properties = list(properties)
+    columns = {prop: [] for prop in properties}
+    for data in extracted_data:
+        for prop in properties:
+            columns[prop].append(data.get(prop))
+    return columns
+
+
+# Compiled checks
+
+def _check_column(check: Callable[[Any], Optional[str]], column: list[Any]) -> Iterable[tuple[int, str]]:
+    """Yields the (index, problem) pairs of a column, calling the check once per distinct value."""
+    results = {}
+    for index, value in enumerate(column):
+        key = tuple(value) if type(value) is list else value
+        try:
+            problem = results[key]
+        except KeyError:
+            problem = results[key] = check(value)
+        except TypeError:
+            # Unhashable value (e.g. a raw date dictionary)
+            problem = check(value)
+        if problem:
+            yield index, problem
+
+def _is_empty(value: Any) -> bool:
+    """Checks whether an extracted value is missing or empty."""
+    return value is None or value == '' or value == []
+
+def _compile_presence_check(label: str) -> Callable[[Any], Optional[str]]:
+    """Builds a check reporting missing values."""
+    message = f"Missing field: {label}"
+    return lambda value: message if _is_empty(value) else None
+
+def _compile_allowed_check(label: str, allowed: frozenset) -> Callable[[Any], Optional[str]]:
+    """Builds a check reporting values outside of the allowed set."""
+    def check(value):
+        if _is_empty(value):
+            return None
+        values = value if type(value) is list else (value,)
+        invalid = [v for v in values if v not in allowed]
+        return f"Invalid value for {label}: {', '.join(map(str, invalid))}" if invalid else None
+    return check
+
+def _compile_pattern_check(label: str, pattern: re.Pattern) -> Callable[[Any], Optional[str]]:
+    """Builds a check reporting values not matching a regular expression."""
+    fullmatch = pattern.fullmatch
+    def check(value):
+        if _is_empty(value):
+            return None
+        values = value if type(value) is list else (value,)
+        invalid = [v for v in values if not fullmatch(str(v))]
+        return f"Invalid format for {label}: {', '.join(map(str, invalid))}" if invalid else None
+    return check
+
+def _compile_date_check(label: str, min_date: Optional[date], max_date: Optional[date]) -> Callable[[Any], Optional[str]]:
+    """Builds a check reporting dates outside of [min_date, max_date]."""
+    def check(value):
+        if _is_empty(value):
+            return None
+        try:
+            bounds = [bound.date() for bound in parse_date_range(value)]
+        except (ValueError, KeyError):
+            # KeyError: unknown time_zone (ZoneInfoNotFoundError)
+            return f"Invalid date for {label}: {value}"
+        if (min_date and bounds[0] < min_date) or (max_date and bounds[-1] > max_date):
+            return f"Date out of range for {label}: {value}"
+        return None
+    return check
+
+def _display_name(prop: Any) -> str:
+    """Returns the display name of a database property, falling back to its enum name."""
+    try:
+        return NotionDatabasePropertyDisplayName[prop.name].value
+    except KeyError:
+        return prop.name
+
+
+# Tests
+
+def test_validate_cards():
+    """Test validating a list of Notion pages against a rule schema."""
+    from constants import DATABASE_ID, PAGE_URL1, PAGE_URL2, PAGE_URL3
+
+    page_manager = NotionPageManager(DATABASE_ID)
+    pages = [page_manager.fetch_page_data_from_url(page_url) for page_url in [PAGE_URL1, PAGE_URL2, PAGE_URL3]]
+    extracted_pages = page_manager.extract_data(pages)
+
+    validator = CardValidator({
+        NotionDatabasePropertyID.NAME: {"required": True},
+        NotionDatabasePropertyID.STATUS: {"required": True, "allowed": ["a087807d-e7e9-4e12-8560-44a3d64d6110"]},
+        NotionDatabasePropertyID.RESPONSIBLE: {"optional": True},
+        NotionDatabasePropertyID.DATE_ECHEANCE: {"min_date": "2022-01-01", "severity": WARNING},
+    })
+    for report in validator.validate(extracted_pages):
+        print(report)
+
+
+if __name__ == "__main__":
+    test_validate_cards()
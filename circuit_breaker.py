@@ -0,0 +1,199 @@
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import Any, Hashable, Iterator, Optional
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of sending a request while the circuit is open."""
+
+
+class CircuitBreaker:
+    """
+    Stops sending requests to an API that keeps failing.
+
+    After 'failure_threshold' consecutive failures (connection errors, timeouts, 5xx responses) the
+    circuit opens: requests fail immediately with CircuitOpenError instead of waiting for timeouts and
+    retries. After 'reset_timeout' seconds the circuit is half-open and lets 'half_open_max_calls' probe
+    requests through: a success closes it again, a failure reopens it for another 'reset_timeout'.
+    Only transport errors (failure_exceptions, OSError by default, which covers the requests exceptions)
+    count as failures: client-side errors such as DeadlineExceeded or KeyboardInterrupt leave the state as is,
+    and 429 responses are backpressure handled by the caller (Retry-After, adaptive concurrency), not failures.
+    """
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30, half_open_max_calls: int = 1,
+                 failure_exceptions: tuple[type[BaseException], ...] = (OSError,)):
+        self.failure_threshold = failure_threshold
+        self.failure_exceptions = failure_exceptions
+        self.reset_timeout = reset_timeout
+        self.half_open_max_calls = half_open_max_calls
+        self._state = CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._probes = 0
+        self._lock = threading.Lock()
+
+    @property
+    def state(self) -> str:
+        """Returns CLOSED, OPEN or HALF_OPEN."""
+        with self._lock:
+            if self._state == OPEN and time.monotonic() - self._opened_at >= self.reset_timeout:
+                return HALF_OPEN
+            return self._state
+
+    @contextmanager
+    def guard(self) -> Iterator["_CallResult"]:
+        """
+        Context manager around one request: raises CircuitOpenError if the circuit does not let it through,
+        then records the outcome. failure_exceptions count as failures, other exceptions are not counted;
+        set result.failed = True for failed responses.
+        """
+        self._before_call()
+        result = _CallResult()
+        try:
+            yield result
+        except self.failure_exceptions:
+            self._record(failed=True)
+            raise
+        except BaseException:
+            self._release_probe()
+            raise
+        else:
+            self._record(result.failed)
+
+    def _before_call(self):
+        """Lets the call through, or raises CircuitOpenError."""
+        with self._lock:
+            if self._state == OPEN:
+                if time.monotonic() - self._opened_at < self.reset_timeout:
+                    raise CircuitOpenError(f"Notion API circuit is open after {self._failures} consecutive failures")
+                self._state = HALF_OPEN
+                self._probes = 0
+            if self._state == HALF_OPEN:
+                if self._probes >= self.half_open_max_calls:
+                    raise CircuitOpenError("Notion API circuit is half-open, waiting for the probe request")
+                self._probes += 1
+
+    def _release_probe(self):
+        """Gives back the probe slot of a half-open call that ended without an outcome."""
+        with self._lock:
+            if self._state == HALF_OPEN and self._probes > 0:
+                self._probes -= 1
+
+    def _record(self, failed: bool):
+        """Updates the state from the outcome of a call."""
+        with self._lock:
+            if not failed:
+                self._state = CLOSED
+                self._failures = 0
+                return
+            self._failures += 1
+            if self._state == HALF_OPEN or self._failures >= self.failure_threshold:
+                self._state = OPEN
+                self._opened_at = time.monotonic()
+
+
+class _CallResult:
+    """Outcome of a call, filled in by the caller of CircuitBreaker.guard()."""
+
+    __slots__ = ('failed',)
+
+    def __init__(self):
+        self.failed = False
+
+
+class StaleCache:
+    """
+    Last successful response of each read, served (marked stale) while the circuit is open.
+    Bounded to 'max_entries', least recently used entries are dropped first. Store immutable snapshots
+    (e.g. the raw response body) and decode them when served: callers then never change the cached copy
+    and successful reads pay no copy.
+    """
+
+    def __init__(self, max_entries: int = 1024):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        """Returns the cached response, or None."""
+        with self._lock:
+            value = self._entries.get(key)
+            if value is not None:
+                self._entries.move_to_end(key)
+            return value
+
+    def put(self, key: Hashable, value: Any):
+        """Stores a successful response."""
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+
+# Tests
+
+def test_circuit_breaker():
+    """Test that the circuit opens after consecutive failures, fails fast, then closes after a successful probe."""
+    breaker = CircuitBreaker(failure_threshold=3, reset_timeout=0.2)
+
+    for _ in range(3):
+        with breaker.guard() as result:
+            result.failed = True
+    print(f"After 3 failures: {breaker.state}")
+
+    start = time.monotonic()
+    try:
+        with breaker.guard():
+            pass
+    except CircuitOpenError as error:
+        print(f"Failed fast in {1000 * (time.monotonic() - start):.3f}ms: {error}")
+
+    time.sleep(0.25)
+    print(f"After the reset timeout: {breaker.state}")
+    with breaker.guard():
+        pass
+    print(f"After a successful probe: {breaker.state}")
+
+
+def test_client_errors_not_counted():
+    """Test that client-side errors neither open the circuit nor hold the half-open probe slot."""
+    breaker = CircuitBreaker(failure_threshold=2, reset_timeout=0.1)
+    for _ in range(5):
+        try:
+            with breaker.guard():
+                raise ValueError("client-side error")
+        except ValueError:
+            pass
+    assert breaker.state == CLOSED
+
+    for _ in range(2):
+        try:
+            with breaker.guard():
+                raise ConnectionError("transport error")
+        except ConnectionError:
+            pass
+    assert breaker.state == OPEN
+
+    time.sleep(0.15)
+    try:
+        with breaker.guard():
+            raise KeyboardInterrupt
+    except KeyboardInterrupt:
+        pass
+    with breaker.guard():
+        pass
+    assert breaker.state == CLOSED
+
+    print("Client errors are not counted")
+
+
+if __name__ == "__main__":
+    test_circuit_breaker()
+    test_client_errors_not_counted()
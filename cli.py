@@ -0,0 +1,294 @@
+"""
+Command line interface: notion-automation pages|blocks|comments|users|query|export.
+
+Only the standard library is imported at startup. The Notion modules (and requests) are imported by the
+subcommand that needs them, and no request is sent before a subcommand runs, so --help and cache-only
+commands (export --status) start in a few tens of milliseconds. 'call' sends an action to the
+daemon (see daemon.py), which keeps the manager and its caches warm between actions. IDs are read from the arguments or,
+when none are given, from NDJSON on stdin; results are written to stdout as NDJSON.
+"""
+import argparse
+import json
+import os
+import sys
+from contextlib import contextmanager
+from typing import Any, Iterable, Iterator, Optional
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    """Entry point of the notion-automation command."""
+    args = _build_parser().parse_args(argv)
+    _add_configuration_path()
+    try:
+        return args.handler(args) or 0
+    except BrokenPipeError:
+        # Output piped to a command that exited early (e.g. head)
+        sys.stdout = open(os.devnull, "w")
+        return 0
+    except ModuleNotFoundError as error:
+        if error.name != "constants":
+            raise
+        print("notion-automation: constants.py not found. Copy constants.example.py to constants.py in the working "
+              "directory or in $NOTION_AUTOMATION_CONFIG_DIR.", file=sys.stderr)
+        return 2
+
+
+def _add_configuration_path():
+    """
+    Makes the user's constants.py importable, from $NOTION_AUTOMATION_CONFIG_DIR or else the working directory:
+    constants.py is not installed with the package, and the installed command does not look in the working directory.
+    """
+    for directory in (os.environ.get("NOTION_AUTOMATION_CONFIG_DIR"), os.getcwd()):
+        if directory and os.path.exists(os.path.join(directory, "constants.py")):
+            if directory not in sys.path:
+                sys.path.insert(0, directory)
+            return
+
+
+def _build_parser() -> argparse.ArgumentParser:
+    """Builds the argument parser of every subcommand."""
+    parser = argparse.ArgumentParser(prog="notion-automation", description="Read and export Notion pages, blocks, comments and users.")
+    parser.add_argument("--database-id", default=os.environ.get("NOTION_DATABASE_ID") or os.environ.get("DATABASE_ID"),
+                        help="Database ID (default: $NOTION_DATABASE_ID or $DATABASE_ID)")
+    parser.add_argument("--dry-run", action="store_true",
+                        help="Send no request (not even for the database schema), print the estimated requests and duration")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    pages = subparsers.add_parser("pages", help="Fetch pages by ID or URL")
+    pages.add_argument("ids", nargs="*", help="Page IDs or URLs (default: NDJSON on stdin)")
+    pages.add_argument("--display", action="store_true", help="Output extracted display values instead of raw pages")
+    pages.set_defaults(handler=_pages)
+
+    blocks = subparsers.add_parser("blocks", help="Fetch the blocks of pages")
+    blocks.add_argument("ids", nargs="*", help="Page or block IDs or URLs (default: NDJSON on stdin)")
+    blocks.add_argument("--recursive", action="store_true", help="Fetch nested blocks under 'children'")
+    blocks.set_defaults(handler=_blocks)
+
+    comments = subparsers.add_parser("comments", help="Fetch the comments of pages")
+    comments.add_argument("ids", nargs="*", help="Page IDs or URLs (default: NDJSON on stdin)")
+    comments.add_argument("--display", action="store_true", help="Output extracted display values instead of raw comments")
+    comments.set_defaults(handler=_comments)
+
+    users = subparsers.add_parser("users", help="Fetch users by ID, or list all users")
+    users.add_argument("ids", nargs="*", help="User IDs (default: NDJSON on stdin, or every user when stdin is a terminal)")
+    users.set_defaults(handler=_users)
+
+    query = subparsers.add_parser("query", help="Query the database")
+    query.add_argument("--filter", type=json.loads, help="Filter object (JSON)")
+    query.add_argument("--sorts", type=json.loads, help="Sorts array (JSON)")
+    query.add_argument("--display", action="store_true", help="Output extracted display values instead of raw pages")
+    query.set_defaults(handler=_query)
+
+    export = subparsers.add_parser("export", help="Export the database to gzip-compressed JSON Lines or CSV")
+    export.add_argument("output", help="Output file, e.g. export.jsonl.gz")
+    export.add_argument("--format", choices=("jsonl", "csv"), default="jsonl")
+    export.add_argument("--checkpoint", help="Checkpoint file (defaults to <output>.checkpoint.json)")
+    export.add_argument("--restart", action="store_true", help="Ignore the checkpoint and start over")
+    export.add_argument("--raw-values", action="store_true", help="Export IDs instead of display names")
+    export.add_argument("--status", action="store_true", help="Print the checkpoint of the export, without network access")
+    export.set_defaults(handler=_export)
+
+    daemon = subparsers.add_parser("daemon", help="Serve actions over a local Unix socket with warm caches")
+    daemon.add_argument("--socket", help="Socket path (default: $NOTION_DAEMON_SOCKET, $XDG_RUNTIME_DIR/notion-automation.sock or /tmp/notion-automation-<uid>/daemon.sock)")
+    daemon.add_argument("--page-ttl", type=float, default=60, help="Seconds a card stays cached")
+    daemon.set_defaults(handler=_daemon)
+
+    call = subparsers.add_parser("call", help="Call a method of the running daemon, e.g. call get_card page_id=<id>")
+    call.add_argument("method", help="get_card, query, comments, comment, update_status, refresh_schema, stats or ping")
+    call.add_argument("params", nargs="*", help="Parameters as key=value (values are parsed as JSON when possible)")
+    call.add_argument("--socket", help="Socket path of the daemon")
+    call.set_defaults(handler=_call)
+    return parser
+
+
+# Subcommands
+
+def _pages(args: argparse.Namespace):
+    """Fetch pages by ID or URL."""
+    manager = _manager(args, schema=args.display)
+    with _maybe_dry_run(manager, args):
+        pages = manager.fetch_pages_data([_page_id(manager, value) for value in _read_ids(args.ids)])
+        _write_items(args, manager, pages)
+
+
+def _blocks(args: argparse.Namespace):
+    """Fetch the blocks of pages."""
+    manager = _manager(args)
+    fetch = manager.fetch_block_tree if args.recursive else manager.fetch_blocks_data
+    with _maybe_dry_run(manager, args):
+        for value in _read_ids(args.ids):
+            _write_items(args, manager, fetch(_page_id(manager, value)))
+
+
+def _comments(args: argparse.Namespace):
+    """Fetch the comments of pages."""
+    manager = _manager(args, schema=args.display)
+    with _maybe_dry_run(manager, args):
+        for value in _read_ids(args.ids):
+            _write_items(args, manager, manager.fetch_comments(_page_id(manager, value)))
+
+
+def _users(args: argparse.Namespace):
+    """Fetch users by ID, or list all users."""
+    manager = _manager(args)
+    from constants import USER_URL, USER_URL_TEMPLATE
+
+    with _maybe_dry_run(manager, args):
+        if not args.ids and sys.stdin.isatty():
+            _write_items(args, manager, manager._fetch_paginated_data(USER_URL))
+            return
+        for user_id in _read_ids(args.ids):
+            _write_items(args, manager, [manager.fetch_url(USER_URL_TEMPLATE.format(user_id=user_id))])
+
+
+def _query(args: argparse.Namespace):
+    """Query the database, streaming each response page to stdout."""
+    manager = _manager(args, schema=True)
+    with _maybe_dry_run(manager, args):
+        for response in manager.iter_query_database(args.filter, args.sorts):
+            _write_items(args, manager, response.get("results", []))
+
+
+def _export(args: argparse.Namespace):
+    """Export the database, or print the export checkpoint."""
+    if args.status:
+        checkpoint_path = args.checkpoint or f"{args.output}.checkpoint.json"
+        if not os.path.exists(checkpoint_path):
+            print(json.dumps({"output": args.output, "started": False}))
+            return 1
+        with open(checkpoint_path, encoding="utf-8") as checkpoint_file:
+            print(json.dumps({"output": args.output, "started": True, **json.load(checkpoint_file)}))
+        return 0
+
+    from exporter import DatabaseExporter
+
+    manager = _manager(args, schema=True)
+    exporter = DatabaseExporter(manager, args.output, args.format, args.checkpoint, for_display=not args.raw_values)
+    if args.dry_run:
+        print(json.dumps(exporter.plan()))
+        return 0
+    checkpoint = exporter.run(restart=args.restart)
+    print(f"Exported {checkpoint['rows']} rows to {args.output}", file=sys.stderr)
+    return 0
+
+
+def _daemon(args: argparse.Namespace):
+    """Run the daemon in the foreground."""
+    from daemon import NotionDaemon
+
+    daemon = NotionDaemon(_manager(args, schema=True), args.socket, args.page_ttl)
+    print(f"Serving on {daemon.socket_path}", file=sys.stderr)
+    daemon.serve_forever()
+
+
+def _call(args: argparse.Namespace):
+    """Call a method of the running daemon; a list result is written as NDJSON."""
+    from daemon_client import DaemonClient
+
+    params = {}
+    for param in args.params:
+        key, _, value = param.partition("=")
+        try:
+            params[key] = json.loads(value)
+        except ValueError:
+            params[key] = value
+    with DaemonClient(args.socket) as client:
+        result = client.call(args.method, **params)
+    items = result if isinstance(result, list) else [result]
+    sys.stdout.write("".join(json.dumps(item, ensure_ascii=False) + "\n" for item in items))
+
+
+# Helpers
+
+def _manager(args: argparse.Namespace, schema: bool = False) -> Any:
+    """
+    Creates the manager used by a subcommand, authenticated with $NOTION_API_TOKEN when set.
+    A NotionPageManager (which fetches the database schema) is only created when the subcommand needs it,
+    and with --dry-run it is created with an empty schema instead, so that nothing is sent.
+    """
+    from notion_manager import NotionManager, NotionPageManager
+
+    token = os.environ.get("NOTION_API_TOKEN")
+    if not schema:
+        return NotionManager(args.database_id, token=token)
+    if not args.database_id:
+        raise SystemExit("notion-automation: a database ID is required (--database-id or $NOTION_DATABASE_ID)")
+    return NotionPageManager(args.database_id, db_properties={} if args.dry_run else None, token=token)
+
+
+@contextmanager
+def _maybe_dry_run(manager: Any, args: argparse.Namespace) -> Iterator[None]:
+    """Runs a subcommand inside manager.dry_run() with --dry-run, then prints the plan summary."""
+    if not args.dry_run:
+        yield
+        return
+    with manager.dry_run() as plan:
+        yield
+    print(json.dumps(plan.summary()))
+
+
+def _read_ids(values: list[str]) -> Iterator[str]:
+    """Yields the IDs given as arguments, or read from NDJSON on stdin (strings, or objects with an 'id')."""
+    if values and values != ["-"]:
+        yield from values
+        return
+    for line in sys.stdin:
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            value = json.loads(line)
+        except ValueError:
+            value = line
+        yield value["id"] if isinstance(value, dict) else str(value)
+
+
+def _page_id(manager: Any, value: str) -> str:
+    """Accepts a page ID or a Notion page URL."""
+    return manager.get_page_id_from_url(value) if value.startswith("http") else value
+
+
+def _write_items(args: argparse.Namespace, manager: Any, items: Iterable[dict[str, Any]]):
+    """Writes items to stdout as NDJSON, extracted for display with --display; dry runs write nothing."""
+    if args.dry_run:
+        return
+    if getattr(args, "display", False):
+        from renderer import DataRenderer
+
+        DataRenderer("jsonl", sys.stdout).render(manager.extract_data(list(items), for_display=True))
+        return
+    sys.stdout.write("".join(json.dumps(item, ensure_ascii=False) + "\n" for item in items))
+    sys.stdout.flush()
+
+
+# Benchmarks
+
+def benchmark_startup(runs: int = 10):
+    """Measures the wall time of 'notion-automation --help' and of the cache-only 'export --status'."""
+    import subprocess
+    import tempfile
+    import time
+
+    checkpoint_path = os.path.join(tempfile.mkdtemp(), "export.jsonl.gz.checkpoint.json")
+    with open(checkpoint_path, "w", encoding="utf-8") as checkpoint_file:
+        json.dump({"format": "jsonl", "next_cursor": None, "rows": 10, "bytes": 100, "done": True}, checkpoint_file)
+
+    commands = {
+        "--help": ["--help"],
+        "export --status": ["export", checkpoint_path[:-len(".checkpoint.json")], "--status"],
+    }
+    for name, arguments in commands.items():
+        timings = []
+        for _ in range(runs):
+            start = time.perf_counter()
+            subprocess.run([sys.executable, os.path.abspath(__file__), *arguments], stdout=subprocess.DEVNULL, check=False)
+            timings.append(time.perf_counter() - start)
+        timings.sort()
+        print(f"{name}: median {1000 * timings[len(timings) // 2]:.1f} ms over {runs} runs")
+
+
+if __name__ == "__main__":
+    if sys.argv[1:] == ["--benchmark-startup"]:
+        benchmark_startup()
+    else:
+        sys.exit(main())
@@ -0,0 +1,232 @@
+import heapq
+import itertools
+import threading
+import time
+from contextlib import contextmanager
+from typing import Iterator, Optional
+
+import requests
+
+from scheduler import RequestPriority, current_priority
+
+
+class AdaptiveConcurrencyLimiter:
+    """
+    AIMD (additive increase, multiplicative decrease) limit on the number of requests in flight.
+
+    While latency stays close to the observed baseline, the limit grows by about one request per round
+    trip. A 429 response or a latency spike above baseline * latency_tolerance cuts it by decrease_factor
+    (at most once per round trip, so a burst of failures counts as one congestion signal).
+    The limit therefore converges to the concurrency the API actually sustains.
+    Waiting requests get free slots by priority (see scheduler.request_priority), then by arrival, so
+    background requests queued for a slot never hold one back from an interactive request.
+    Transport timeouts and connection errors (congestion_exceptions) count as throttling; other exceptions
+    (DeadlineExceeded, CircuitOpenError, KeyboardInterrupt...) free the slot without changing the limit.
+    """
+
+    def __init__(self, initial_limit: float = 2, min_limit: float = 1, max_limit: float = 16,
+                 decrease_factor: float = 0.5, latency_tolerance: float = 2.0, baseline_alpha: float = 0.05,
+                 congestion_exceptions: tuple[type[BaseException], ...] = (requests.Timeout, requests.ConnectionError)):
+        self.min_limit = min_limit
+        self.congestion_exceptions = congestion_exceptions
+        self.max_limit = max_limit
+        self.decrease_factor = decrease_factor
+        self.latency_tolerance = latency_tolerance
+        self.baseline_alpha = baseline_alpha
+        self._limit = float(initial_limit)
+        self._in_flight = 0
+        self._baseline_latency = None
+        self._last_decrease = 0.0
+        self._condition = threading.Condition()
+        self._waiters = []
+        self._sequence = itertools.count()
+
+    @property
+    def limit(self) -> int:
+        """Current number of requests allowed in flight."""
+        return max(int(self.min_limit), int(self._limit))
+
+    @property
+    def in_flight(self) -> int:
+        """Number of requests currently in flight."""
+        return self._in_flight
+
+    @contextmanager
+    def slot(self, priority: Optional[RequestPriority] = None) -> Iterator["_Outcome"]:
+        """
+        Context manager around one request: waits for a free slot (by priority, the current one by default), then records the outcome.
+        Mark throttled responses with outcome.throttled = True; congestion_exceptions count as throttling too,
+        other exceptions leave the limit unchanged.
+        Set outcome.latency to exclude local waits (e.g. for a rate-limit token) from the measured latency.
+        """
+        priority = current_priority() if priority is None else priority
+        entry = (int(priority), next(self._sequence))
+        with self._condition:
+            heapq.heappush(self._waiters, entry)
+            try:
+                while self._waiters[0] != entry or self._in_flight >= self.limit:
+                    self._condition.wait()
+            except BaseException:
+                # An interrupted waiter must not stay at the head of the queue
+                self._waiters.remove(entry)
+                heapq.heapify(self._waiters)
+                self._condition.notify_all()
+                raise
+            heapq.heappop(self._waiters)
+            self._in_flight += 1
+            # The next waiter may fit too
+            self._condition.notify_all()
+
+        outcome = _Outcome()
+        start = time.monotonic()
+        counted = True
+        try:
+            yield outcome
+        except self.congestion_exceptions:
+            outcome.throttled = True
+            raise
+        except BaseException:
+            counted = False
+            raise
+        finally:
+            if counted:
+                latency = outcome.latency if outcome.latency is not None else time.monotonic() - start
+                self._release(latency, outcome.throttled)
+            else:
+                self._free()
+
+    def _release(self, latency: float, throttled: bool):
+        """Frees the slot and adjusts the limit from the request outcome."""
+        with self._condition:
+            self._in_flight -= 1
+            now = time.monotonic()
+            baseline = self._baseline_latency
+            spike = baseline is not None and latency > baseline * self.latency_tolerance
+
+            if throttled or spike:
+                # One decrease per round trip
+                if now - self._last_decrease > (baseline or latency):
+                    self._limit = max(self.min_limit, self._limit * self.decrease_factor)
+                    self._last_decrease = now
+            else:
+                self._limit = min(self.max_limit, self._limit + 1 / self._limit)
+
+            if not throttled:
+                if baseline is None:
+                    self._baseline_latency = latency
+                else:
+                    self._baseline_latency = baseline + self.baseline_alpha * (latency - baseline)
+            self._condition.notify_all()
+
+    def _free(self):
+        """Frees the slot of a request that ended without an outcome."""
+        with self._condition:
+            self._in_flight -= 1
+            self._condition.notify_all()
+
+    def stats(self) -> dict[str, Optional[float]]:
+        """Returns the current limit, requests in flight and baseline latency."""
+        baseline = self._baseline_latency
+        return {"limit": self.limit, "in_flight": self._in_flight, "baseline_latency": round(baseline, 3) if baseline else None}
+
+
+class _Outcome:
+    """Outcome of a request, filled in by the caller of AdaptiveConcurrencyLimiter.slot()."""
+
+    __slots__ = ('throttled', 'latency')
+
+    def __init__(self):
+        self.throttled = False
+        self.latency = None
+
+
+# Tests
+
+def test_limit_converges():
+    """Test that the limit grows while the simulated API keeps up and backs off once it throttles."""
+    from concurrent.futures import ThreadPoolExecutor
+
+    limiter = AdaptiveConcurrencyLimiter(max_limit=32)
+    sustained_concurrency = 6
+    limits = []
+
+    def send(_):
+        with limiter.slot() as outcome:
+            # Beyond the sustained concurrency the API answers slowly or with a 429
+            overloaded = limiter.in_flight > sustained_concurrency
+            time.sleep(0.05 if overloaded else 0.01)
+            outcome.throttled = overloaded
+        limits.append(limiter.limit)
+
+    with ThreadPoolExecutor(max_workers=32) as executor:
+        list(executor.map(send, range(2000)))
+    print(f"Limit over time: {limits[::200]}, final stats: {limiter.stats()}")
+
+
+def test_slots_by_priority():
+    """Test that a freed slot goes to a waiting interactive request before earlier background requests."""
+    from concurrent.futures import ThreadPoolExecutor
+
+    limiter = AdaptiveConcurrencyLimiter(initial_limit=1, max_limit=1)
+    served = []
+
+    def send(priority):
+        with limiter.slot(priority):
+            served.append(priority)
+            time.sleep(0.01)
+
+    with ThreadPoolExecutor(max_workers=12) as executor:
+        futures = [executor.submit(send, RequestPriority.BACKGROUND) for _ in range(10)]
+        time.sleep(0.02)
+        futures.append(executor.submit(send, RequestPriority.INTERACTIVE))
+        for future in futures:
+            future.result()
+    position = served.index(RequestPriority.INTERACTIVE)
+    assert position <= 4, served
+    print(f"Interactive request served after {position} of 10 background requests")
+
+
+
+def test_client_errors_keep_limit():
+    """Test that client-side errors leave the limit unchanged and that an interrupted waiter leaves the queue."""
+    import signal
+
+    limiter = AdaptiveConcurrencyLimiter(initial_limit=4)
+    for _ in range(3):
+        try:
+            with limiter.slot():
+                raise ValueError("client-side error")
+        except ValueError:
+            pass
+    assert limiter.limit == 4 and limiter.in_flight == 0, limiter.stats()
+
+    limiter = AdaptiveConcurrencyLimiter(initial_limit=1, max_limit=1)
+    release = threading.Event()
+
+    def hold():
+        with limiter.slot():
+            release.wait()
+
+    holder = threading.Thread(target=hold)
+    holder.start()
+    while limiter.in_flight == 0:
+        time.sleep(0.001)
+    # Interrupt the main thread (Ctrl+C) while it waits for a slot
+    threading.Timer(0.05, signal.pthread_kill, (threading.main_thread().ident, signal.SIGINT)).start()
+    try:
+        with limiter.slot():
+            pass
+    except KeyboardInterrupt:
+        pass
+    release.set()
+    holder.join()
+    with limiter.slot():
+        pass
+    assert not limiter._waiters
+    print("Client errors keep the limit and interrupted waiters leave the queue")
+
+
+if __name__ == "__main__":
+    test_limit_converges()
+    test_slots_by_priority()
+    test_client_errors_keep_limit()
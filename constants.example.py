@@ -1,8 +1,9 @@
+import os
 from enum import Enum
 
 
-NOTION_API_TOKEN = "your-integration-api-token"
-DATABASE_ID = "your-notion-page-id"
+NOTION_API_TOKEN = os.environ.get("NOTION_API_TOKEN", "your-integration-api-token")
+DATABASE_ID = os.environ.get("NOTION_DATABASE_ID", "your-notion-page-id")
 
 # Sample result dictionary (simulating the API response)
 properties = {
@@ -51,6 +52,7 @@ class NotionBasePropertyID(Enum):
     LAST_EDITED_TIME = "last_edited_time"
     CREATED_TIME = "created_time"
     ARCHIVED = "archived"
+    IN_TRASH = "in_trash"
     LAST_EDITED_BY = "last_edited_by"
     PARENT = "parent"
 
@@ -61,6 +63,7 @@ class NotionBasePropertyDisplayName(Enum):
     LAST_EDITED_TIME = "Last Edited Time"
     CREATED_TIME = "Created Time"
     ARCHIVED = "Archived"
+    IN_TRASH = "In Trash"
     LAST_EDITED_BY = "Last Edited By"
     PARENT = "Parent"
 
@@ -89,8 +92,12 @@ class NotionCommentPropertyDisplayName(Enum):
 # Define URLs and API headers
 BASE_URL = "https://api.notion.com/v1"
 DATABASE_URL_TEMPLATE = f"{BASE_URL}/databases/{{database_id}}"
+DATABASE_QUERY_URL_TEMPLATE = f"{BASE_URL}/databases/{{database_id}}/query"
 PAGE_URL_TEMPLATE = f"{BASE_URL}/pages/{{page_id}}"
+PAGE_PROPERTY_URL_TEMPLATE = f"{BASE_URL}/pages/{{page_id}}/properties/{{property_id}}"
 BLOCK_URL_TEMPLATE = f"{BASE_URL}/blocks/{{page_id}}/children"
+BLOCK_OBJECT_URL_TEMPLATE = f"{BASE_URL}/blocks/{{block_id}}"
 USER_URL_TEMPLATE = f"{BASE_URL}/users/{{user_id}}"
 USER_URL = f"{BASE_URL}/users"
-COMMENTS_URL = f"{BASE_URL}/comments"
\ No newline at end of file
+COMMENTS_URL = f"{BASE_URL}/comments"
+SEARCH_URL = f"{BASE_URL}/search"
\ No newline at end of file
@@ -0,0 +1,373 @@
+import sqlite3
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Any, Optional
+
+from notion_manager import NotionManager
+from scheduler import RequestPriority, request_priority, with_current_context
+from settings import DATABASE_QUERY_URL_TEMPLATE
+from utils import _extract_page_title
+
+PENDING = "pending"
+IN_PROGRESS = "in_progress"
+DONE = "done"
+FAILED = "failed"
+
+# Frontier item kinds: a page or block whose children are listed, or a database whose pages are queried
+PAGE = "page"
+BLOCK = "block"
+DATABASE = "database"
+
+
+class WorkspaceCrawler:
+    """
+    Inventory of everything the integration can see: pages, databases and databases embedded in pages.
+
+    A pass enumerates the workspace with POST /search, then a worker pool lists the blocks of each
+    page (following nested blocks), discovering child_page and child_database blocks, and queries the
+    pages of each discovered database. The frontier (items to fetch) and the inventory are stored in
+    SQLite after every fetch, so a crawl can be stopped at any point and resumed by calling crawl() again.
+    A new pass only re-crawls pages whose last_edited_time changed since they were crawled.
+    Objects are stamped with the pass that last saw them: when a pass completes, objects it did not see
+    although it could have (found by search, or listed by a page or database crawled again) were deleted
+    or moved to the trash, and are pruned from the inventory.
+    Fetches are sent with the BACKGROUND priority, so interactive actions go first.
+    """
+
+    MAX_ATTEMPTS = 3
+
+    def __init__(self, manager: NotionManager, db_path: str, max_workers: Optional[int] = None):
+        self.manager = manager
+        self.db_path = db_path
+        self.max_workers = max_workers or int(manager.concurrency.max_limit)
+        self._stop = threading.Event()
+        self._connection = sqlite3.connect(db_path, isolation_level=None)
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._setup()
+
+    def _setup(self):
+        """Creates the frontier, inventory and state tables."""
+        self._connection.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS frontier (
+                id TEXT PRIMARY KEY, kind TEXT, page_id TEXT, state TEXT, attempts INTEGER DEFAULT 0,
+                error TEXT, updated_at REAL
+            );
+            CREATE INDEX IF NOT EXISTS frontier_state ON frontier (state);
+            CREATE TABLE IF NOT EXISTS objects (
+                id TEXT PRIMARY KEY, object TEXT, title TEXT, parent_type TEXT, parent_id TEXT, url TEXT,
+                discovered_via TEXT, last_edited_time TEXT, crawled_edited_time TEXT
+            );
+            CREATE TABLE IF NOT EXISTS state (key TEXT PRIMARY KEY, value TEXT);
+            """
+        )
+        # Columns added after the first inventories were created: container_id is the page or database whose
+        # listing found the object (NULL for search), seen_pass and crawled_pass the last pass that saw or crawled it
+        columns = {row[1] for row in self._connection.execute("PRAGMA table_info(objects)")}
+        for column, column_type in (("container_id", "TEXT"), ("seen_pass", "INTEGER"), ("crawled_pass", "INTEGER")):
+            if column not in columns:
+                self._connection.execute(f"ALTER TABLE objects ADD COLUMN {column} {column_type}")
+        if "seen_pass" not in columns:
+            # Objects found before the upgrade count as seen by the pass in progress, so it does not prune them
+            self._connection.execute("UPDATE objects SET seen_pass = ?", (self._pass_number(),))
+
+    # Crawl
+
+    def crawl(self, max_items: Optional[int] = None) -> dict[str, Any]:
+        """
+        Runs (or resumes) a pass, fetching at most max_items frontier items, and returns stats().
+        Returns early, with the frontier saved, when stop() is called.
+        """
+        self._stop.clear()
+        # Items being fetched when the previous run stopped are fetched again
+        self._connection.execute("UPDATE frontier SET state = ? WHERE state = ?", (PENDING, IN_PROGRESS))
+
+        with request_priority(RequestPriority.BACKGROUND):
+            if self._get_state("pass") in (None, DONE):
+                with self._transaction():
+                    self._set_state("pass_number", str(self._pass_number() + 1))
+                    self._set_state("pass", "searching")
+                    self._set_state("search_cursor", None)
+            if self._get_state("pass") == "searching":
+                self._search()
+            if self._get_state("pass") == "crawling":
+                self._process_frontier(max_items)
+        return self.stats()
+
+    def stop(self):
+        """Asks a running crawl() to return after the fetches in flight (from another thread)."""
+        self._stop.set()
+
+    def _search(self):
+        """
+        Enumerates the workspace with /search, saving the cursor after every response page.
+        The last page also records that the search is complete, with the highest last_edited_time seen
+        (the watermark), in the same transaction, so a crawl stopped right after it does not search again.
+        """
+        responses = self.manager.iter_search(start_cursor=self._get_state("search_cursor"))
+        for response in responses:
+            with self._transaction():
+                for result in response.get("results", []):
+                    self._discover(result, "search")
+                self._set_state("search_cursor", response.get("next_cursor"))
+                if not response.get("has_more"):
+                    self._complete_search()
+            if self._stop.is_set():
+                return
+        if self._get_state("pass") == "searching":
+            # No response page at all
+            self._complete_search()
+
+    def _complete_search(self):
+        """Marks the search of the current pass complete and saves its last-edited watermark."""
+        pass_number = self._pass_number()
+        watermark = self._connection.execute(
+            "SELECT MAX(last_edited_time) FROM objects WHERE seen_pass = ? AND discovered_via = 'search'", (pass_number,)
+        ).fetchone()[0]
+        self._set_state("search_watermark", watermark)
+        self._set_state("search_complete", str(pass_number))
+        self._set_state("pass", "crawling")
+
+    def _process_frontier(self, max_items: Optional[int]):
+        """Fetches pending frontier items with the worker pool until the frontier is empty."""
+        fetch = with_current_context(self._fetch)
+        fetched = 0
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            running = {}
+            while True:
+                capacity = 2 * self.max_workers - len(running)
+                if max_items is not None:
+                    capacity = min(capacity, max_items - fetched - len(running))
+                if capacity > 0 and not self._stop.is_set():
+                    for item in self._claim(capacity):
+                        running[executor.submit(fetch, item)] = item
+                if not running:
+                    break
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    item = running.pop(future)
+                    fetched += 1
+                    self._complete(item, future)
+
+        if not self._stop.is_set() and self._count_frontier(PENDING) == 0:
+            with self._transaction():
+                self._prune()
+                self._set_state("pass", DONE)
+
+    def _prune(self):
+        """
+        Deletes the objects the completed pass should have seen but did not: found by search, or listed by a page
+        or database crawled (successfully) during the pass, or whose container was itself pruned.
+        Objects under containers that were not crawled again (unchanged or failed) are kept.
+        """
+        pass_number = self._pass_number()
+        while True:
+            pruned = [row[0] for row in self._connection.execute(
+                """
+                SELECT id FROM objects
+                WHERE COALESCE(seen_pass, 0) < :pass AND (
+                    container_id IS NULL
+                    OR container_id NOT IN (SELECT id FROM objects)
+                    OR container_id IN (SELECT id FROM objects WHERE crawled_pass = :pass)
+                )
+                """,
+                {"pass": pass_number},
+            )]
+            if not pruned:
+                return
+            self._delete_objects(pruned)
+
+    def _delete_objects(self, object_ids: list[str]):
+        """Removes objects from the inventory, with their frontier items (and those of their nested blocks)."""
+        self._connection.executemany("DELETE FROM objects WHERE id = ?", [(object_id,) for object_id in object_ids])
+        self._connection.executemany(
+            "DELETE FROM frontier WHERE id = ? OR page_id = ?", [(object_id, object_id) for object_id in object_ids]
+        )
+
+    def _claim(self, limit: int) -> list[tuple[str, str, str]]:
+        """Marks up to 'limit' pending items in progress and returns them."""
+        with self._transaction():
+            items = self._connection.execute(
+                "SELECT id, kind, page_id FROM frontier WHERE state = ? ORDER BY rowid LIMIT ?", (PENDING, limit)
+            ).fetchall()
+            self._connection.executemany(
+                "UPDATE frontier SET state = ?, updated_at = ? WHERE id = ?", [(IN_PROGRESS, time.time(), item[0]) for item in items]
+            )
+        return items
+
+    def _fetch(self, item: tuple[str, str, str]) -> list[dict[str, Any]]:
+        """Fetches the children of a page or block, or the pages of a database (in a worker thread)."""
+        item_id, kind, _ = item
+        if kind == DATABASE:
+            url = DATABASE_QUERY_URL_TEMPLATE.format(database_id=item_id)
+            return self.manager._fetch_paginated_data(url, body={"page_size": 100})
+        return self.manager.fetch_blocks_data(item_id)
+
+    def _complete(self, item: tuple[str, str, str], future: Any):
+        """Stores the result of a fetch: discovered objects, new frontier items and the item state."""
+        item_id, kind, page_id = item
+        try:
+            children = future.result()
+        except Exception as error:
+            with self._transaction():
+                attempts = self._connection.execute("SELECT attempts FROM frontier WHERE id = ?", (item_id,)).fetchone()[0] + 1
+                state = FAILED if attempts >= self.MAX_ATTEMPTS else PENDING
+                self._connection.execute(
+                    "UPDATE frontier SET state = ?, attempts = ?, error = ?, updated_at = ? WHERE id = ?",
+                    (state, attempts, str(error)[:500], time.time(), item_id),
+                )
+            return
+
+        with self._transaction():
+            for child in children:
+                if kind == DATABASE:
+                    self._discover(child, "database", page_id)
+                elif child.get("type") == "child_page":
+                    self._discover(child, "child_page", page_id)
+                elif child.get("type") == "child_database":
+                    self._discover(child, "child_database", page_id)
+                elif child.get("has_children"):
+                    self._enqueue(child["id"], BLOCK, page_id)
+            if kind in (PAGE, DATABASE):
+                self._connection.execute(
+                    "UPDATE objects SET crawled_edited_time = last_edited_time, crawled_pass = ? WHERE id = ?",
+                    (self._pass_number(), item_id),
+                )
+            self._connection.execute(
+                "UPDATE frontier SET state = ?, error = NULL, updated_at = ? WHERE id = ?", (DONE, time.time(), item_id)
+            )
+
+    # Inventory
+
+    def _discover(self, notion_object: dict[str, Any], discovered_via: str, container_id: Optional[str] = None):
+        """
+        Records a page or database in the inventory and enqueues it when it is new or was edited since its last crawl.
+        last_edited_time only comes from the object itself (search results, database pages): a child_page or
+        child_database block carries the block's own timestamp, so block discovery only enqueues new objects.
+        container_id is the page or database whose listing returned the object (None for search).
+        Archived or trashed objects are removed from the inventory instead.
+        """
+        if notion_object.get("archived") or notion_object.get("in_trash"):
+            self._delete_objects([notion_object["id"]])
+            return
+        object_type = _object_type(notion_object)
+        parent = notion_object.get("parent", {})
+        parent_type = parent.get("type")
+        from_block = discovered_via in ("child_page", "child_database")
+        last_edited_time = None if from_block else notion_object.get("last_edited_time")
+
+        row = self._connection.execute("SELECT crawled_edited_time FROM objects WHERE id = ?", (notion_object["id"],)).fetchone()
+        self._connection.execute(
+            """
+            INSERT INTO objects (id, object, title, parent_type, parent_id, url, discovered_via, last_edited_time, container_id, seen_pass)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            ON CONFLICT(id) DO UPDATE SET
+                object = excluded.object, title = excluded.title, parent_type = excluded.parent_type,
+                parent_id = excluded.parent_id, url = COALESCE(excluded.url, url),
+                last_edited_time = COALESCE(excluded.last_edited_time, last_edited_time),
+                container_id = excluded.container_id, seen_pass = excluded.seen_pass
+            """,
+            (notion_object["id"], object_type, _title(notion_object), parent_type, parent.get(parent_type) if parent_type else None,
+             notion_object.get("url"), discovered_via, last_edited_time, container_id, self._pass_number()),
+        )
+        if row is None or (not from_block and (row[0] is None or row[0] != last_edited_time)):
+            self._enqueue(notion_object["id"], DATABASE if object_type == "database" else PAGE, notion_object["id"])
+
+    def _enqueue(self, item_id: str, kind: str, page_id: str):
+        """Adds an item to the frontier, or schedules a crawled item again."""
+        self._connection.execute(
+            """
+            INSERT INTO frontier (id, kind, page_id, state, updated_at) VALUES (?, ?, ?, ?, ?)
+            ON CONFLICT(id) DO UPDATE SET state = excluded.state, attempts = 0, updated_at = excluded.updated_at
+            WHERE frontier.state IN (?, ?)
+            """,
+            (item_id, kind, page_id, PENDING, time.time(), DONE, FAILED),
+        )
+
+    def inventory(self, object_type: Optional[str] = None) -> list[dict[str, Any]]:
+        """Returns the discovered pages and databases (or only one object type)."""
+        query = "SELECT id, object, title, parent_type, parent_id, url, discovered_via, last_edited_time FROM objects"
+        params = ()
+        if object_type:
+            query += " WHERE object = ?"
+            params = (object_type,)
+        columns = ("id", "object", "title", "parent_type", "parent_id", "url", "discovered_via", "last_edited_time")
+        return [dict(zip(columns, row)) for row in self._connection.execute(query, params)]
+
+    def stats(self) -> dict[str, Any]:
+        """Counts the frontier items by state and the inventory by object type."""
+        frontier = dict(self._connection.execute("SELECT state, COUNT(*) FROM frontier GROUP BY state").fetchall())
+        objects = dict(self._connection.execute("SELECT object, COUNT(*) FROM objects GROUP BY object").fetchall())
+        return {"pass": self._get_state("pass"), "search_watermark": self._get_state("search_watermark"), "frontier": frontier, "objects": objects}
+
+    # Storage helpers
+
+    def _count_frontier(self, state: str) -> int:
+        """Counts the frontier items in a state."""
+        return self._connection.execute("SELECT COUNT(*) FROM frontier WHERE state = ?", (state,)).fetchone()[0]
+
+    def _pass_number(self) -> int:
+        """Returns the number of the current (or last) pass, 0 before the first one."""
+        return int(self._get_state("pass_number") or 0)
+
+    def _get_state(self, key: str) -> Optional[str]:
+        """Reads a crawl state value (pass, search cursor)."""
+        row = self._connection.execute("SELECT value FROM state WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else None
+
+    def _set_state(self, key: str, value: Optional[str]):
+        """Writes a crawl state value."""
+        self._connection.execute("INSERT OR REPLACE INTO state (key, value) VALUES (?, ?)", (key, value))
+
+    def _transaction(self) -> "_Transaction":
+        """Groups the writes of one step, so a stopped crawl never keeps half of a result."""
+        return _Transaction(self._connection)
+
+
+class _Transaction:
+    """BEGIN/COMMIT (or ROLLBACK on error) around a block, for connections in autocommit mode."""
+
+    def __init__(self, connection: sqlite3.Connection):
+        self.connection = connection
+
+    def __enter__(self):
+        self.connection.execute("BEGIN IMMEDIATE")
+
+    def __exit__(self, exc_type, *exc_info):
+        self.connection.execute("ROLLBACK" if exc_type else "COMMIT")
+        return False
+
+
+def _object_type(notion_object: dict[str, Any]) -> str:
+    """Returns 'page' or 'database', for search results, database pages and child_page/child_database blocks."""
+    if notion_object.get("type") == "child_database":
+        return "database"
+    if notion_object.get("type") == "child_page":
+        return "page"
+    return notion_object.get("object", "page")
+
+
+def _title(notion_object: dict[str, Any]) -> str:
+    """Returns the plain-text title of a page, database or child_page/child_database block."""
+    block_type = notion_object.get("type")
+    if block_type in ("child_page", "child_database"):
+        return notion_object[block_type].get("title", "")
+    if notion_object.get("object") == "database":
+        return "".join(part.get("plain_text", "") for part in notion_object.get("title", []))
+    return _extract_page_title(notion_object)
+
+
+# Tests
+
+def test_crawl_workspace():
+    """Test crawling the workspace, then re-running the crawl incrementally."""
+    crawler = WorkspaceCrawler(NotionManager(), "workspace.sqlite")
+    start = time.monotonic()
+    print(crawler.crawl(), f"{time.monotonic() - start:.1f}s")
+    start = time.monotonic()
+    print(crawler.crawl(), f"{time.monotonic() - start:.1f}s (incremental)")
+
+
+if __name__ == "__main__":
+    test_crawl_workspace()
@@ -0,0 +1,275 @@
+import argparse
+import json
+import os
+import socketserver
+import threading
+import time
+from typing import Any, Optional
+
+from aggregates import CardAggregator
+from constants import DATABASE_ID
+from daemon_client import DaemonClient, check_socket_path, default_socket_path
+from notion_manager import NotionPageManager
+from planner import current_plan
+from renderer import COMMENT_COLUMNS, PAGE_COLUMNS
+from scheduler import RequestPriority, request_priority
+
+
+class TTLCache:
+    """
+    Thread-safe cache whose entries expire 'ttl' seconds after being stored.
+    Entries are kept in expiry order, so each put() drops the expired ones from the front, and at most
+    max_entries are kept (the oldest go first).
+    """
+
+    def __init__(self, ttl: float, kind: str, max_entries: int = 10_000):
+        self.ttl = ttl
+        self.kind = kind
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._entries = {}
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[Any]:
+        """Returns the cached value, or None when missing or expired."""
+        with self._lock:
+            entry = self._entries.get(key)
+            hit = entry is not None and entry[0] > time.monotonic()
+            if hit:
+                self.hits += 1
+            else:
+                self.misses += 1
+        plan = current_plan()
+        if plan is not None:
+            plan.record_cache_lookup(self.kind, hit)
+        return entry[1] if hit else None
+
+    def put(self, key: str, value: Any):
+        """Stores a value."""
+        now = time.monotonic()
+        with self._lock:
+            self._entries.pop(key, None)
+            self._entries[key] = (now + self.ttl, value)
+            while self._entries:
+                oldest_key, (expires_at, _) = next(iter(self._entries.items()))
+                if expires_at > now and len(self._entries) <= self.max_entries:
+                    break
+                del self._entries[oldest_key]
+
+    def invalidate(self, key: str):
+        """Drops a value, e.g. after the object was updated."""
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def stats(self) -> dict[str, int]:
+        """Returns hit, miss and entry counts."""
+        with self._lock:
+            return {"hits": self.hits, "misses": self.misses, "entries": len(self._entries)}
+
+
+class NotionDaemon:
+    """
+    Long-running process serving admin actions over a local Unix socket.
+
+    The page manager is created once, so the schema, user names, connection pool, rate limiter and
+    adaptive concurrency limit stay warm between actions, and cards are cached for 'page_ttl' seconds.
+    An action costs the Notion calls it actually needs (none on a cache hit) instead of an interpreter
+    start, imports and a schema fetch. Requests are served with the INTERACTIVE priority.
+    Every card the daemon fetches or updates is applied to the status/team/responsible aggregates, which
+    each unfiltered query rebuilds, so the dashboard counts are read without extracting the cards again.
+    Methods are exposed as rpc_<name> and called with daemon_client.DaemonClient.
+    """
+
+    def __init__(self, page_manager: NotionPageManager, socket_path: Optional[str] = None, page_ttl: float = 60):
+        self.page_manager = page_manager
+        self.socket_path = socket_path or default_socket_path()
+        self.pages = TTLCache(page_ttl, "page")
+        self.aggregates = CardAggregator()
+        self.started_at = time.time()
+        self._server = None
+
+    # RPC methods
+
+    def rpc_ping(self) -> str:
+        """Checks that the daemon is running."""
+        return "pong"
+
+    def rpc_get_card(self, page_id: str, display: bool = True) -> dict[str, Any]:
+        """Returns a card from the cache, or fetches it."""
+        page = self.pages.get(page_id)
+        if page is None:
+            return self._store_pages([self.page_manager.fetch_page_data(page_id)], display)[0]
+        return self._format_card(page, display)
+
+    def rpc_query(self, filter: Optional[dict[str, Any]] = None, sorts: Optional[list[dict[str, Any]]] = None,
+                  display: bool = True) -> list[dict[str, Any]]:
+        """
+        Queries the database (always fresh) and refreshes the cached cards.
+        An unfiltered query returns every card, so the aggregates are rebuilt from it, dropping deleted and archived cards.
+        """
+        pages = self.page_manager.query_database(filter, sorts)
+        return self._store_pages(pages, display, rebuild_aggregates=filter is None)
+
+    def rpc_comments(self, page_id: str, display: bool = True) -> list[dict[str, Any]]:
+        """Returns the comments of a card."""
+        comments = self.page_manager.fetch_comments(page_id)
+        if not display:
+            return comments
+        return [_to_row(comment, COMMENT_COLUMNS) for comment in self.page_manager.extract_data(comments, for_display=True)]
+
+    def rpc_comment(self, page_id: str, text: str, mentions: Optional[list[str]] = None) -> dict[str, Any]:
+        """Adds a comment to a card, mentioning users for each '@' in the text."""
+        return self.page_manager.add_comment_to_page(page_id, text, mentions)
+
+    def rpc_update_status(self, page_id: str, status: str, display: bool = True) -> dict[str, Any]:
+        """Sets the status of a card and caches the updated card."""
+        return self._store_pages([self.page_manager.update_status(page_id, status)], display)[0]
+
+    def rpc_refresh_schema(self) -> int:
+        """Fetches the database schema again (e.g. after adding an option) and returns the number of properties."""
+        self.page_manager.refresh_schema()
+        return len(self.page_manager.db_properties)
+
+    def rpc_aggregates(self) -> dict[str, Any]:
+        """
+        Returns the card counts per status, team and responsible name, as of the last unfiltered query
+        plus the cards fetched or updated through the daemon since then.
+        """
+        return self.aggregates.summary()
+
+    def rpc_stats(self) -> dict[str, Any]:
+        """Reports uptime, cache and transport statistics."""
+        return {
+            "uptime": round(time.time() - self.started_at),
+            "pages": self.pages.stats(),
+            "users_cached": len(self.page_manager._user_names),
+            "concurrency": self.page_manager.concurrency.stats(),
+            "scheduler": self.page_manager.scheduler.metrics(),
+            "circuit": self.page_manager.circuit_breaker.state,
+            "transport": self.page_manager.transport_stats(),
+        }
+
+    def _store_pages(self, pages: list[dict[str, Any]], display: bool, rebuild_aggregates: bool = False) -> list[dict[str, Any]]:
+        """
+        Caches fetched or updated cards, applies them to the aggregates (or rebuilds the aggregates from them)
+        and returns them formatted. The batch is extracted once, so its follow-up reads are batched too.
+        """
+        for page in pages:
+            self.pages.put(page['id'], page)
+        cards = self.page_manager.extract_data(pages, for_display=True)
+        if rebuild_aggregates:
+            aggregates = CardAggregator()
+            aggregates.load(cards)
+            self.aggregates = aggregates
+        else:
+            self.aggregates.load(cards)
+        if not display:
+            return pages
+        return [_to_row(card, PAGE_COLUMNS) for card in cards]
+
+    def _format_card(self, page: dict[str, Any], display: bool) -> dict[str, Any]:
+        """Returns the raw page, or its values for display keyed by column header."""
+        if not display:
+            return page
+        return _to_row(self.page_manager.extract_data(page, for_display=True), PAGE_COLUMNS)
+
+    # Server
+
+    def handle(self, request: dict[str, Any]) -> dict[str, Any]:
+        """Runs one RPC request and returns its response."""
+        method = getattr(self, f"rpc_{request.get('method')}", None)
+        if method is None:
+            return {"error": f"Unknown method: {request.get('method')}"}
+        try:
+            with request_priority(RequestPriority.INTERACTIVE):
+                return {"result": method(**request.get("params", {}))}
+        except Exception as error:
+            return {"error": f"{type(error).__name__}: {error}"}
+
+    def serve_forever(self):
+        """
+        Listens on the Unix socket (readable by the current user only) until shutdown().
+        The socket directory is created with mode 0700 if needed, and refused if other users could replace the socket.
+        """
+        os.makedirs(os.path.dirname(os.path.abspath(self.socket_path)), mode=0o700, exist_ok=True)
+        check_socket_path(self.socket_path, socket_exists=False)
+        if os.path.lexists(self.socket_path):
+            os.unlink(self.socket_path)
+        self._server = _ThreadingUnixServer(self.socket_path, _RequestHandler)
+        self._server.daemon = self
+        os.chmod(self.socket_path, 0o600)
+        try:
+            self._server.serve_forever()
+        finally:
+            self._server.server_close()
+            if os.path.exists(self.socket_path):
+                os.unlink(self.socket_path)
+
+    def shutdown(self):
+        """Stops serve_forever() (from another thread)."""
+        if self._server is not None:
+            self._server.shutdown()
+
+
+class _ThreadingUnixServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+
+class _RequestHandler(socketserver.StreamRequestHandler):
+    """Serves the requests of one client connection, one JSON line each."""
+
+    def handle(self):
+        for line in self.rfile:
+            try:
+                request = json.loads(line)
+            except ValueError as error:
+                response = {"error": f"Invalid request: {error}"}
+            else:
+                response = self.server.daemon.handle(request)
+            self.wfile.write((json.dumps(response, ensure_ascii=False, default=str) + "\n").encode("utf-8"))
+            self.wfile.flush()
+
+
+def _to_row(extracted: Any, columns: list[tuple[Any, str]]) -> dict[str, Any]:
+    """Converts extracted values (keyed by property enums) to a JSON object keyed by column header."""
+    return {header: extracted.get(prop) for prop, header in columns}
+
+
+def main():
+    """Run the daemon in the foreground."""
+    parser = argparse.ArgumentParser(description="Serve Notion admin actions over a local Unix socket.")
+    parser.add_argument("--socket", help="Socket path (default: $NOTION_DAEMON_SOCKET, $XDG_RUNTIME_DIR/notion-automation.sock or /tmp/notion-automation-<uid>/daemon.sock)")
+    parser.add_argument("--database-id", default=os.environ.get("NOTION_DATABASE_ID", DATABASE_ID))
+    parser.add_argument("--page-ttl", type=float, default=60, help="Seconds a card stays cached")
+    args = parser.parse_args()
+
+    page_manager = NotionPageManager(args.database_id, token=os.environ.get("NOTION_API_TOKEN"))
+    daemon = NotionDaemon(page_manager, args.socket, args.page_ttl)
+    print(f"Serving on {daemon.socket_path}")
+    daemon.serve_forever()
+
+
+# Tests
+
+def test_daemon_round_trip():
+    """Test a warm round trip: the first get_card fetches the card, the second one is served from the cache."""
+    page_manager = NotionPageManager(DATABASE_ID)
+    daemon = NotionDaemon(page_manager, socket_path=f"/tmp/notion-automation-test-{os.getpid()}.sock")
+    server = threading.Thread(target=daemon.serve_forever, daemon=True)
+    server.start()
+    while not os.path.exists(daemon.socket_path):
+        time.sleep(0.01)
+
+    page_id = page_manager.query_database()[0]['id']
+    with DaemonClient(daemon.socket_path) as client:
+        for attempt in ("cold", "warm"):
+            start = time.perf_counter()
+            card = client.call("get_card", page_id=page_id)
+            print(f"{attempt}: {1000 * (time.perf_counter() - start):.1f} ms", card)
+        print(client.call("stats")["pages"])
+    daemon.shutdown()
+
+
+if __name__ == "__main__":
+    main()
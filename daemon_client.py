@@ -0,0 +1,93 @@
+"""
+Thin client of the notion-automation daemon (see daemon.py).
+
+Only uses the standard library, so a script or the CLI calling the daemon starts without importing
+requests or the Notion modules: the cost of an action is one round trip on the local socket.
+"""
+import json
+import os
+import socket
+import stat
+import tempfile
+from typing import Any, Optional
+
+
+def default_socket_path() -> str:
+    """
+    Returns $NOTION_DAEMON_SOCKET, or a socket in the user's runtime directory ($XDG_RUNTIME_DIR),
+    or in a per-user directory of the temporary directory (created with mode 0700 by the daemon).
+    """
+    if os.environ.get("NOTION_DAEMON_SOCKET"):
+        return os.environ["NOTION_DAEMON_SOCKET"]
+    runtime_dir = os.environ.get("XDG_RUNTIME_DIR")
+    if runtime_dir:
+        return os.path.join(runtime_dir, "notion-automation.sock")
+    return os.path.join(tempfile.gettempdir(), f"notion-automation-{os.getuid()}", "daemon.sock")
+
+
+def check_socket_path(socket_path: str, socket_exists: bool = True):
+    """
+    Checks that the socket directory belongs to the current user (or root) and that other users cannot replace
+    its entries (not writable by them, or sticky like /tmp), and that the socket, when socket_exists, is a socket
+    owned by the current user. Another local user therefore cannot pre-create or hijack the socket.
+    """
+    directory = os.path.dirname(os.path.abspath(socket_path))
+    directory_status = os.stat(directory)
+    if directory_status.st_uid not in (os.getuid(), 0):
+        raise PermissionError(f"{directory} belongs to another user")
+    if directory_status.st_mode & 0o022 and not directory_status.st_mode & stat.S_ISVTX:
+        raise PermissionError(f"{directory} is writable by other users")
+    if socket_exists:
+        socket_status = os.lstat(socket_path)
+        if socket_status.st_uid != os.getuid() or not stat.S_ISSOCK(socket_status.st_mode):
+            raise PermissionError(f"{socket_path} is not a socket owned by the current user")
+
+
+class DaemonError(Exception):
+    """Raised when the daemon reports an error for a call."""
+
+
+class DaemonClient:
+    """Calls daemon methods over its Unix socket, one JSON line per request and per response."""
+
+    def __init__(self, socket_path: Optional[str] = None, timeout: float = 60):
+        self.socket_path = socket_path or default_socket_path()
+        self.timeout = timeout
+        self._socket = None
+        self._reader = None
+
+    def call(self, method: str, **params: Any) -> Any:
+        """Calls a daemon method (e.g. 'get_card', 'query', 'comment', 'update_status') and returns its result."""
+        if self._socket is None:
+            self._connect()
+        request = json.dumps({"method": method, "params": params}, ensure_ascii=False) + "\n"
+        self._socket.sendall(request.encode("utf-8"))
+        line = self._reader.readline()
+        if not line:
+            self.close()
+            raise DaemonError("The daemon closed the connection")
+        response = json.loads(line)
+        if "error" in response:
+            raise DaemonError(response["error"])
+        return response["result"]
+
+    def _connect(self):
+        """Opens the connection to the daemon socket."""
+        check_socket_path(self.socket_path)
+        self._socket = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self._socket.settimeout(self.timeout)
+        self._socket.connect(self.socket_path)
+        self._reader = self._socket.makefile("r", encoding="utf-8")
+
+    def close(self):
+        """Closes the connection."""
+        if self._socket is not None:
+            self._reader.close()
+            self._socket.close()
+            self._socket = self._reader = None
+
+    def __enter__(self) -> "DaemonClient":
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
@@ -0,0 +1,181 @@
+from bisect import bisect_left, bisect_right
+from datetime import datetime, time, timezone
+from functools import lru_cache
+from typing import Any, Iterable, Optional
+from zoneinfo import ZoneInfo
+
+from constants import NotionBasePropertyID, NotionDatabasePropertyID
+
+# Date-only values and datetimes without offset or time_zone are read in this timezone
+DEFAULT_TIMEZONE = timezone.utc
+
+
+@lru_cache(maxsize=16384)
+def parse_date(value: str, time_zone: Optional[str] = None) -> datetime:
+    """
+    Parses a Notion ISO date or datetime string into a timezone-aware datetime (memoized).
+    Naive values are read in time_zone (the 'time_zone' of a Notion date), or DEFAULT_TIMEZONE.
+    """
+    parsed = datetime.fromisoformat(value.replace('Z', '+00:00'))
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=ZoneInfo(time_zone) if time_zone else DEFAULT_TIMEZONE)
+    return parsed
+
+
+def _aware(value: datetime) -> datetime:
+    """Reads a naive query bound in DEFAULT_TIMEZONE, like naive stored values."""
+    return value.replace(tzinfo=DEFAULT_TIMEZONE) if value.tzinfo is None else value
+
+
+def parse_date_range(value: Any) -> Optional[tuple[datetime, datetime]]:
+    """
+    Returns the (start, end) datetimes of a date value, or None when it is empty.
+    Accepts extracted values ("start" or "start to end") and raw Notion dates ({'start', 'end', 'time_zone'}).
+    A date-only end covers its whole day, and a value without end is the range [start, start].
+    """
+    if not value:
+        return None
+    if type(value) is dict:
+        start, end, time_zone = value.get('start'), value.get('end'), value.get('time_zone')
+        if not start:
+            return None
+    else:
+        start, _, end = str(value).partition(" to ")
+        time_zone = None
+    end = end or start
+    end_date = parse_date(end, time_zone)
+    if 'T' not in end:
+        end_date = datetime.combine(end_date.date(), time.max, end_date.tzinfo)
+    return parse_date(start, time_zone), end_date
+
+
+class DateIntervalIndex:
+    """
+    Interval index over a date property of cards, for due-date queries.
+
+    Cards are stored as (start, end) ranges. Queries use arrays sorted by start and by end, plus a tree
+    of the maximum end over the start order: overdue() and due_between() are two binary searches, and
+    overlapping() costs O(log n) per card found. add() and remove() only mark the index for a rebuild,
+    which happens once, at the next query, so applying a batch of changes costs a single sort.
+    """
+
+    def __init__(self, prop: Any = NotionDatabasePropertyID.DATE_ECHEANCE):
+        self.prop = prop
+        self._ranges = {}
+        self._dirty = False
+        self._by_start = []
+        self._starts = []
+        self._by_end = []
+        self._ends = []
+        self._max_end = []
+
+    @classmethod
+    def from_cards(cls, cards: Iterable[Any], prop: Any = NotionDatabasePropertyID.DATE_ECHEANCE) -> "DateIntervalIndex":
+        """Builds the index of extracted cards (dictionaries, records or page views)."""
+        index = cls(prop)
+        for card in cards:
+            index.add(card)
+        return index
+
+    def __len__(self) -> int:
+        return len(self._ranges)
+
+    def add(self, card: Any):
+        """Indexes a card, or re-indexes it after a change; cards without a date are left out."""
+        page_id = card.get(NotionBasePropertyID.ID)
+        date_range = parse_date_range(card.get(self.prop))
+        if date_range is None:
+            self.remove(page_id)
+            return
+        if self._ranges.get(page_id) != date_range:
+            self._ranges[page_id] = date_range
+            self._dirty = True
+
+    def remove(self, page_id: str):
+        """Drops a card from the index (e.g. after it was archived)."""
+        if self._ranges.pop(page_id, None) is not None:
+            self._dirty = True
+
+    def range(self, page_id: str) -> Optional[tuple[datetime, datetime]]:
+        """Returns the indexed (start, end) range of a card."""
+        return self._ranges.get(page_id)
+
+    # Queries
+
+    def overdue(self, now: Optional[datetime] = None) -> list[str]:
+        """Returns the IDs of cards whose range ended before now, earliest first (naive bounds are read in DEFAULT_TIMEZONE)."""
+        self._rebuild()
+        now = _aware(now) if now else datetime.now(timezone.utc)
+        return self._by_end[:bisect_left(self._ends, now)]
+
+    def due_between(self, start: datetime, end: datetime) -> list[str]:
+        """Returns the IDs of cards whose range ends within [start, end], earliest first."""
+        self._rebuild()
+        start, end = _aware(start), _aware(end)
+        return self._by_end[bisect_left(self._ends, start):bisect_right(self._ends, end)]
+
+    def overlapping(self, start: datetime, end: datetime) -> list[str]:
+        """Returns the IDs of cards whose range intersects [start, end], by start."""
+        self._rebuild()
+        start, end = _aware(start), _aware(end)
+        count = bisect_right(self._starts, end)
+        found = []
+        if count:
+            self._collect(1, 0, len(self._max_end) // 2, count, start, found)
+        return [self._by_start[position] for position in found]
+
+    def _collect(self, node: int, low: int, high: int, count: int, start: datetime, found: list[int]):
+        """Appends the positions below 'count' whose end is not before start, skipping subtrees that end before it."""
+        if low >= count or self._max_end[node] is None or self._max_end[node] < start:
+            return
+        if high - low == 1:
+            found.append(low)
+            return
+        middle = (low + high) // 2
+        self._collect(2 * node, low, middle, count, start, found)
+        self._collect(2 * node + 1, middle, high, count, start, found)
+
+    def _rebuild(self):
+        """Sorts the ranges and rebuilds the max-end tree after changes."""
+        if not self._dirty:
+            return
+        by_start = sorted(self._ranges.items(), key=lambda item: item[1][0])
+        by_end = sorted(self._ranges.items(), key=lambda item: item[1][1])
+        self._by_start = [page_id for page_id, _ in by_start]
+        self._starts = [date_range[0] for _, date_range in by_start]
+        self._by_end = [page_id for page_id, _ in by_end]
+        self._ends = [date_range[1] for _, date_range in by_end]
+
+        size = 1
+        while size < len(by_start):
+            size *= 2
+        max_end = [None] * (2 * size)
+        for position, (_, date_range) in enumerate(by_start):
+            max_end[size + position] = date_range[1]
+        for node in range(size - 1, 0, -1):
+            children = [end for end in (max_end[2 * node], max_end[2 * node + 1]) if end is not None]
+            max_end[node] = max(children) if children else None
+        self._max_end = max_end
+        self._dirty = False
+
+
+# Tests
+
+def test_date_queries():
+    """Test overdue, due-this-week and overlapping queries over the due dates of every card."""
+    from datetime import timedelta
+
+    from constants import DATABASE_ID
+    from notion_manager import NotionPageManager
+
+    page_manager = NotionPageManager(DATABASE_ID)
+    index = DateIntervalIndex.from_cards(page_manager.extract_data(page_manager.query_database()))
+    now = datetime.now(timezone.utc)
+    print(f"{len(index)} cards with a due date")
+    print(f"Overdue: {len(index.overdue(now))}")
+    print(f"Due within a week: {len(index.due_between(now, now + timedelta(days=7)))}")
+    print(f"Overlapping the next 30 days: {len(index.overlapping(now, now + timedelta(days=30)))}")
+
+
+if __name__ == "__main__":
+    test_date_queries()
@@ -0,0 +1,71 @@
+import contextvars
+import time
+from contextlib import contextmanager
+from typing import Iterator, Optional
+
+_current_deadline = contextvars.ContextVar("notion_operation_deadline", default=None)
+
+
+class DeadlineExceeded(Exception):
+    """Raised when the deadline of the current operation has passed."""
+
+
+@contextmanager
+def deadline(seconds: float) -> Iterator[None]:
+    """
+    Gives every request made inside the block a shared time budget, e.g. 'process this card within 10s'.
+    Nested deadlines can only shorten the budget of the enclosing operation. The deadline follows
+    the context into thread pools wrapped with scheduler.with_current_context.
+    """
+    new_deadline = time.monotonic() + seconds
+    current = _current_deadline.get()
+    token = _current_deadline.set(new_deadline if current is None else min(current, new_deadline))
+    try:
+        yield
+    finally:
+        _current_deadline.reset(token)
+
+
+def remaining_time() -> Optional[float]:
+    """Returns the seconds left before the deadline of the current operation, None without deadline."""
+    current = _current_deadline.get()
+    if current is None:
+        return None
+    return current - time.monotonic()
+
+
+def request_timeout(default: Optional[float]) -> Optional[float]:
+    """Returns the timeout of the next request: the per-call default, shortened to the remaining budget."""
+    remaining = remaining_time()
+    if remaining is None:
+        return default
+    if remaining <= 0:
+        raise DeadlineExceeded("Operation deadline exceeded before the request was sent")
+    return remaining if default is None else min(default, remaining)
+
+
+def check_deadline(wait_time: float = 0):
+    """Raises DeadlineExceeded if the budget left cannot cover 'wait_time' more seconds."""
+    remaining = remaining_time()
+    if remaining is not None and remaining <= wait_time:
+        raise DeadlineExceeded(f"Operation deadline exceeded ({max(remaining, 0):.2f}s left, {wait_time:.2f}s needed)")
+
+
+# Tests
+
+def test_nested_deadlines():
+    """Test that nested deadlines only shorten the budget and that an expired budget fails fast."""
+    with deadline(10):
+        with deadline(0.05):
+            time.sleep(0.1)
+            try:
+                request_timeout(30)
+                print("Expected DeadlineExceeded")
+            except DeadlineExceeded as error:
+                print(f"Inner budget exhausted: {error}")
+        with deadline(60):
+            print(f"Outer budget still applies: {request_timeout(30):.2f}s")
+
+
+if __name__ == "__main__":
+    test_nested_deadlines()
@@ -0,0 +1,125 @@
+import argparse
+import gzip
+import io
+import json
+import os
+from typing import Any, Optional
+
+from constants import DATABASE_ID
+from notion_manager import NotionPageManager
+from renderer import DataRenderer
+
+EXPORT_FORMATS = ("jsonl", "csv")
+
+
+class DatabaseExporter:
+    """
+    Streams a full database query into a gzip-compressed JSON Lines or CSV file.
+
+    After every response page (100 cards), the rows are appended as a complete gzip member and a
+    checkpoint (next cursor, row count, output size) is written atomically. If the export stops halfway,
+    running it again truncates the output to the last checkpoint and resumes from the saved cursor,
+    so earlier pages are neither downloaded nor written twice.
+    """
+
+    def __init__(self, page_manager: NotionPageManager, output_path: str, format: str = "jsonl",
+                 checkpoint_path: Optional[str] = None, filter: Optional[dict[str, Any]] = None,
+                 sorts: Optional[list[dict[str, Any]]] = None, properties: Optional[list[Any]] = None,
+                 for_display: bool = True):
+        if format not in EXPORT_FORMATS:
+            raise ValueError(f"Unsupported export format: {format}. Expected one of {EXPORT_FORMATS}")
+        self.page_manager = page_manager
+        self.output_path = output_path
+        self.format = format
+        self.checkpoint_path = checkpoint_path or f"{output_path}.checkpoint.json"
+        self.filter = filter
+        self.sorts = sorts
+        self.properties = properties
+        self.for_display = for_display
+
+    def run(self, restart: bool = False) -> dict[str, Any]:
+        """Runs (or resumes) the export and returns the final checkpoint."""
+        checkpoint = None if restart else self._load_checkpoint()
+        if checkpoint and checkpoint.get('done'):
+            return checkpoint
+        if checkpoint is None:
+            checkpoint = {"format": self.format, "next_cursor": None, "rows": 0, "bytes": 0, "done": False}
+            self._save_checkpoint(checkpoint)
+        elif checkpoint.get('format') != self.format:
+            raise ValueError(f"Checkpoint was created for the {checkpoint.get('format')} format.")
+
+        # Drop anything written after the last checkpoint (partially written page)
+        with open(self.output_path, "ab") as output_file:
+            output_file.truncate(checkpoint['bytes'])
+
+        responses = self.page_manager.iter_query_database(self.filter, self.sorts, self.properties, checkpoint['next_cursor'])
+        for response in responses:
+            extracted_pages = self.page_manager.extract_data(response.get("results", []), self.for_display)
+            rows = self._append(extracted_pages, header=checkpoint['rows'] == 0)
+
+            checkpoint = {
+                "format": self.format,
+                "next_cursor": response.get("next_cursor"),
+                "rows": checkpoint['rows'] + rows,
+                "bytes": os.path.getsize(self.output_path),
+                "done": not response.get("has_more", False),
+            }
+            self._save_checkpoint(checkpoint)
+        return checkpoint
+
+    def plan(self) -> dict[str, Any]:
+        """Estimates the requests and duration of a full export without sending them (see NotionManager.dry_run)."""
+        with self.page_manager.dry_run() as plan:
+            for _ in self.page_manager.iter_query_database(self.filter, self.sorts, self.properties):
+                pass
+        return plan.summary()
+
+    def _append(self, extracted_pages: list[dict[str, Any]], header: bool) -> int:
+        """Appends rows to the output as a new gzip member and syncs it to disk."""
+        with open(self.output_path, "ab") as output_file:
+            with gzip.GzipFile(fileobj=output_file, mode="wb") as gzip_file:
+                with io.TextIOWrapper(gzip_file, encoding="utf-8", newline="") as text_stream:
+                    rows = DataRenderer(self.format, text_stream).render(extracted_pages, header=header)
+            output_file.flush()
+            os.fsync(output_file.fileno())
+        return rows
+
+    def _load_checkpoint(self) -> Optional[dict[str, Any]]:
+        """Loads the checkpoint file, if any."""
+        if not os.path.exists(self.checkpoint_path):
+            return None
+        with open(self.checkpoint_path, encoding="utf-8") as checkpoint_file:
+            return json.load(checkpoint_file)
+
+    def _save_checkpoint(self, checkpoint: dict[str, Any]):
+        """Writes the checkpoint file atomically."""
+        tmp_path = f"{self.checkpoint_path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as checkpoint_file:
+            json.dump(checkpoint, checkpoint_file)
+            checkpoint_file.flush()
+            os.fsync(checkpoint_file.fileno())
+        os.replace(tmp_path, self.checkpoint_path)
+
+
+def main():
+    """Export the database to a compressed file, resuming from the checkpoint if there is one."""
+    parser = argparse.ArgumentParser(description="Export the Notion database to gzip-compressed JSON Lines or CSV.")
+    parser.add_argument("output", help="Output file, e.g. export.jsonl.gz")
+    parser.add_argument("--format", choices=EXPORT_FORMATS, default="jsonl")
+    parser.add_argument("--checkpoint", help="Checkpoint file (defaults to <output>.checkpoint.json)")
+    parser.add_argument("--restart", action="store_true", help="Ignore the checkpoint and start over")
+    parser.add_argument("--raw-values", action="store_true", help="Export IDs instead of display names")
+    parser.add_argument("--plan", action="store_true", help="Only estimate the requests and duration of the export")
+    args = parser.parse_args()
+
+    page_manager = NotionPageManager(DATABASE_ID)
+    exporter = DatabaseExporter(page_manager, args.output, args.format, args.checkpoint, for_display=not args.raw_values)
+    if args.plan:
+        print(exporter.plan())
+        return
+    checkpoint = exporter.run(restart=args.restart)
+    print(f"Exported {checkpoint['rows']} rows to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,267 @@
+import hashlib
+import json
+import os
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+from typing import Any, Optional
+from urllib.parse import urlsplit
+
+import requests
+
+from notion_manager import NotionManager, NotionPageManager
+
+FILE_BLOCK_TYPES = ("image", "file", "pdf")
+# Blocks whose children belong to another page
+SUBPAGE_BLOCK_TYPES = ("child_page", "child_database")
+
+
+class NotionFileDownloader:
+    """
+    Downloads files referenced by Notion pages (files properties) and blocks (image/file blocks).
+    Files are streamed to disk in chunks, stored by content hash, and cached across runs.
+    """
+
+    CHUNK_SIZE = 64 * 1024
+    EXPIRY_MARGIN = timedelta(seconds=60)
+    INDEX_FILE_NAME = "index.json"
+
+    def __init__(self, manager: NotionManager, cache_dir: str, max_workers: int = 8, timeout: float = 60):
+        self.manager = manager
+        self.cache_dir = cache_dir
+        self.objects_dir = os.path.join(cache_dir, "objects")
+        self.max_workers = max_workers
+        self.timeout = timeout
+        self._index_lock = threading.Lock()
+        os.makedirs(self.objects_dir, exist_ok=True)
+        self._index = self._load_index()
+
+    # Collect file references
+
+    def collect_page_files(self, page_data: dict[str, Any]) -> list[dict[str, Any]]:
+        """Collect file references from every 'files' property of a Notion page."""
+        file_refs = []
+        for property_data in page_data.get('properties', {}).values():
+            if property_data.get('type') != 'files':
+                continue
+            for position, file_data in enumerate(property_data.get('files', [])):
+                file_ref = _file_ref_from_object(file_data)
+                file_ref.update({
+                    "source": "page",
+                    "parent_id": page_data.get('id'),
+                    "property_id": property_data.get('id'),
+                    "position": position,
+                })
+                file_refs.append(file_ref)
+        return file_refs
+
+    def collect_block_files(self, blocks_data: list[dict[str, Any]]) -> list[dict[str, Any]]:
+        """Collect file references from image/file blocks, including those nested under 'children' (see fetch_block_tree)."""
+        file_refs = []
+        for block in blocks_data:
+            block_type = block.get('type')
+            if block.get('children'):
+                file_refs.extend(self.collect_block_files(block['children']))
+            if block_type not in FILE_BLOCK_TYPES:
+                continue
+            file_ref = _file_ref_from_object(block.get(block_type, {}))
+            file_ref.update({
+                "source": "block",
+                "parent_id": block.get('id'),
+                "property_id": None,
+                "position": 0,
+            })
+            file_refs.append(file_ref)
+        return file_refs
+
+    # Download
+
+    def download_page_files(self, page_id: str, include_blocks: bool = True) -> list[dict[str, Any]]:
+        """
+        Download every file attached to a page, through its properties and optionally its blocks,
+        including blocks nested in toggles, columns or callouts (but not in subpages).
+        """
+        file_refs = self.collect_page_files(self.manager.fetch_page_data(page_id))
+        if include_blocks:
+            blocks = self.manager.fetch_block_tree(page_id, skip_children_types=SUBPAGE_BLOCK_TYPES)
+            file_refs.extend(self.collect_block_files(blocks))
+        return self.download(file_refs)
+
+    def download(self, file_refs: list[dict[str, Any]]) -> list[dict[str, Any]]:
+        """
+        Download a list of file references concurrently.
+        Returns one result per reference, in the same order, with 'sha256', 'path', 'size' and 'cached' set.
+        Failed downloads have 'error' set instead of raising, so one bad file does not abort the batch.
+        """
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            results = list(executor.map(self._download_one, file_refs))
+        self._save_index()
+        return results
+
+    def _download_one(self, file_ref: dict[str, Any]) -> dict[str, Any]:
+        """Download a single file reference, using the cache and refreshing expired URLs."""
+        result = dict(file_ref)
+        if not file_ref.get('url'):
+            result['error'] = "Missing file URL"
+            return result
+        cache_key = _cache_key(file_ref)
+
+        with self._index_lock:
+            cached_entry = self._index.get(cache_key)
+        if cached_entry and os.path.exists(self._object_path(cached_entry['sha256'])):
+            result.update(cached_entry, path=self._object_path(cached_entry['sha256']), cached=True)
+            return result
+
+        try:
+            if _is_expired(file_ref.get('expiry_time'), self.EXPIRY_MARGIN):
+                file_ref = self.refresh_file_ref(file_ref)
+            try:
+                sha256, size = self._stream_to_cache(file_ref['url'])
+            except _ExpiredURLError:
+                file_ref = self.refresh_file_ref(file_ref)
+                sha256, size = self._stream_to_cache(file_ref['url'])
+        except Exception as e:
+            result['error'] = str(e)
+            return result
+
+        entry = {"sha256": sha256, "size": size, "name": file_ref.get('name')}
+        with self._index_lock:
+            self._index[cache_key] = entry
+        result.update(entry, url=file_ref['url'], expiry_time=file_ref.get('expiry_time'), path=self._object_path(sha256), cached=False)
+        return result
+
+    def _stream_to_cache(self, url: str) -> tuple[str, int]:
+        """Stream a URL to a temporary file while hashing it, then move it into the content-addressed store."""
+        hasher = hashlib.sha256()
+        size = 0
+
+        with requests.get(url, stream=True, timeout=self.timeout) as response:
+            if response.status_code in (400, 403):
+                raise _ExpiredURLError(f"File URL rejected: {response.status_code}")
+            if response.status_code != 200:
+                raise Exception(f"Failed to download file: {response.status_code}")
+
+            fd, tmp_path = tempfile.mkstemp(dir=self.cache_dir, suffix=".part")
+            try:
+                with os.fdopen(fd, "wb") as tmp_file:
+                    for chunk in response.iter_content(chunk_size=self.CHUNK_SIZE):
+                        hasher.update(chunk)
+                        tmp_file.write(chunk)
+                        size += len(chunk)
+            except BaseException:
+                os.remove(tmp_path)
+                raise
+
+        sha256 = hasher.hexdigest()
+        object_path = self._object_path(sha256)
+        if os.path.exists(object_path):
+            # Same content already stored (dedup)
+            os.remove(tmp_path)
+        else:
+            os.makedirs(os.path.dirname(object_path), exist_ok=True)
+            os.replace(tmp_path, object_path)
+        return sha256, size
+
+    # Expired URLs
+
+    def refresh_file_ref(self, file_ref: dict[str, Any]) -> dict[str, Any]:
+        """Re-fetch the owning page or block to get a fresh signed URL for a file reference."""
+        if file_ref['source'] == 'block':
+            block = self.manager.fetch_block_data(file_ref['parent_id'])
+            fresh_refs = self.collect_block_files([block])
+        else:
+            page_data = self.manager.fetch_page_data(file_ref['parent_id'])
+            fresh_refs = [
+                ref for ref in self.collect_page_files(page_data)
+                if ref['property_id'] == file_ref['property_id']
+            ]
+
+        for fresh_ref in fresh_refs:
+            if fresh_ref['position'] == file_ref['position'] and fresh_ref['name'] == file_ref['name']:
+                return fresh_ref
+        raise Exception(f"File no longer available: {file_ref.get('name')}")
+
+    # Cache index
+
+    def _object_path(self, sha256: str) -> str:
+        """Return the content-addressed path of a stored file."""
+        return os.path.join(self.objects_dir, sha256[:2], sha256)
+
+    def _load_index(self) -> dict[str, dict[str, Any]]:
+        """Load the URL-to-hash cache index from disk."""
+        index_path = os.path.join(self.cache_dir, self.INDEX_FILE_NAME)
+        if not os.path.exists(index_path):
+            return {}
+        with open(index_path, encoding="utf-8") as index_file:
+            return json.load(index_file)
+
+    def _save_index(self):
+        """Persist the URL-to-hash cache index atomically."""
+        index_path = os.path.join(self.cache_dir, self.INDEX_FILE_NAME)
+        with self._index_lock:
+            content = json.dumps(self._index)
+        tmp_path = index_path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as index_file:
+            index_file.write(content)
+        os.replace(tmp_path, index_path)
+
+
+class _ExpiredURLError(Exception):
+    """Raised when the storage backend rejects a signed URL."""
+
+
+def _file_ref_from_object(file_data: dict[str, Any]) -> dict[str, Any]:
+    """Builds a file reference from a Notion file object (either 'file' or 'external')."""
+    file_type = file_data.get('type')
+    content = file_data.get(file_type, {}) or {}
+    url = content.get('url')
+    return {
+        "name": file_data.get('name') or _file_name_from_url(url),
+        "type": file_type,
+        "url": url,
+        "expiry_time": content.get('expiry_time'),
+    }
+
+
+def _file_name_from_url(url: Optional[str]) -> Optional[str]:
+    """Returns the last path segment of a URL."""
+    if not url:
+        return None
+    return urlsplit(url).path.rsplit('/', 1)[-1] or None
+
+
+def _cache_key(file_ref: dict[str, Any]) -> str:
+    """
+    Signed URLs of Notion-hosted files change at every fetch, only the part before the query string identifies
+    the file. External URLs are kept whole: their query string may select the file.
+    """
+    if file_ref.get('type') != 'file':
+        return file_ref['url']
+    parts = urlsplit(file_ref['url'])
+    return f"{parts.netloc}{parts.path}"
+
+
+def _is_expired(expiry_time: Optional[str], margin: timedelta) -> bool:
+    """Checks whether a Notion 'expiry_time' is in the past (or about to be)."""
+    if not expiry_time:
+        return False
+    expires_at = datetime.fromisoformat(expiry_time.replace('Z', '+00:00'))
+    return expires_at - margin <= datetime.now(timezone.utc)
+
+
+# Tests
+
+def test_download_page_files():
+    """Test downloading the files and images of a Notion page."""
+    from constants import DATABASE_ID, PAGE_URL2
+
+    page_manager = NotionPageManager(DATABASE_ID)
+    downloader = NotionFileDownloader(page_manager, cache_dir="downloads")
+    page_id = page_manager.get_page_id_from_url(PAGE_URL2)
+    for result in downloader.download_page_files(page_id):
+        print(result.get('name'), result.get('sha256'), result.get('path'), result.get('error'))
+
+
+if __name__ == "__main__":
+    test_download_page_files()
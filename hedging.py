@@ -0,0 +1,187 @@
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Any, Callable, Optional
+
+from deadlines import remaining_time
+
+
+class RequestHedger:
+    """
+    Sends a duplicate of a slow idempotent request and returns the first response.
+
+    A request still unanswered the p95 latency observed so far (at least 'min_samples' requests) after it
+    was actually sent is sent a second time: the time spent queued before it (scheduler, concurrency slot,
+    token bucket) does not count, since the recorded latencies do not include it either; whichever copy answers first wins and the other one is left to finish in the
+    background. Duplicates consume rate-limit quota like any request, so at most 'max_extra_fraction'
+    of the requests are hedged, and stats() reports how much extra quota was spent.
+    """
+
+    LATENCY_WINDOW = 500
+
+    def __init__(self, percentile: float = 0.95, min_samples: int = 20, max_extra_fraction: float = 0.1, max_workers: int = 16):
+        self.percentile = percentile
+        self.min_samples = min_samples
+        self.max_extra_fraction = max_extra_fraction
+        self._latencies = deque(maxlen=self.LATENCY_WINDOW)
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="notion-hedge")
+        self._lock = threading.Lock()
+        self._stats = {"requests": 0, "hedged": 0, "hedge_wins": 0}
+
+    def record(self, latency: float):
+        """Records the latency of an answered request."""
+        with self._lock:
+            self._latencies.append(latency)
+
+    def hedge_delay(self) -> Optional[float]:
+        """Returns the delay after which a request is duplicated, None until enough latencies are recorded."""
+        with self._lock:
+            if len(self._latencies) < self.min_samples:
+                return None
+            latencies = sorted(self._latencies)
+        return latencies[min(len(latencies) - 1, int(self.percentile * len(latencies)))]
+
+    def run(self, send: Callable[[Callable[[], None]], Any]) -> Any:
+        """
+        Calls send(mark_sent) and, if it is slow, a second time; returns the first successful result.
+        send calls mark_sent() right before each HTTP request, which starts the hedge delay.
+        """
+        with self._lock:
+            self._stats["requests"] += 1
+            budget_left = self._stats["hedged"] < self.max_extra_fraction * self._stats["requests"]
+
+        delay = self.hedge_delay()
+        sent = _SendTimer()
+        primary = self._executor.submit(send, sent.mark)
+        if delay is None or not budget_left:
+            return primary.result()
+
+        primary.add_done_callback(lambda _: sent.mark())
+        while True:
+            sent.wait()
+            timeout = delay - (time.monotonic() - sent.sent_at)
+            if timeout <= 0:
+                break
+            done, _ = wait([primary], timeout=timeout)
+            if done:
+                return primary.result()
+        remaining = remaining_time()
+        if primary.done() or (remaining is not None and remaining <= delay):
+            return primary.result()
+
+        with self._lock:
+            self._stats["hedged"] += 1
+        hedge = self._executor.submit(send, lambda: None)
+        pending = {primary, hedge}
+        failed = None
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                if future.exception() is None:
+                    if future is hedge:
+                        with self._lock:
+                            self._stats["hedge_wins"] += 1
+                    return future.result()
+                failed = future
+        # Both copies failed
+        return failed.result()
+
+    def stats(self) -> dict[str, Any]:
+        """Reports requests, hedged duplicates (extra quota used), duplicates that answered first and the hedge delay."""
+        delay = self.hedge_delay()
+        with self._lock:
+            stats = dict(self._stats)
+        stats["extra_quota_fraction"] = round(stats["hedged"] / stats["requests"], 3) if stats["requests"] else 0.0
+        stats["hedge_delay"] = round(delay, 3) if delay is not None else None
+        return stats
+
+
+class _SendTimer:
+    """Time at which a request was last sent, waited for until it is sent (or its call has finished)."""
+
+    def __init__(self):
+        self.sent_at = None
+        self._sent = threading.Event()
+
+    def mark(self):
+        """Records that the request is being sent now."""
+        self.sent_at = time.monotonic()
+        self._sent.set()
+
+    def wait(self):
+        """Blocks until the request has been sent."""
+        self._sent.wait()
+
+
+# Tests
+
+def test_hedging_cuts_tail_latency():
+    """Test that hedging answers requests stuck in a simulated slow tail at about the p95 latency."""
+    import itertools
+
+    hedger = RequestHedger()
+    sequence = itertools.count()
+    sent_latencies = []
+
+    def send(mark_sent):
+        # One request in 40 gets stuck for a second
+        mark_sent()
+        index = next(sequence)
+        latency = 1.0 if index % 40 == 39 else 0.02 + 0.001 * (index % 7)
+        sent_latencies.append(latency)
+        time.sleep(latency)
+        hedger.record(latency)
+        return latency
+
+    start = time.monotonic()
+    for _ in range(200):
+        hedger.run(send)
+    elapsed = time.monotonic() - start
+    print(f"200 requests in {elapsed:.2f}s, {sum(sent_latencies):.2f}s of latency sent in total, {hedger.stats()}")
+
+
+def test_queue_wait_not_hedged():
+    """Test that time spent queued before the request is sent does not trigger hedging."""
+    hedger = RequestHedger(max_extra_fraction=1.0)
+    for _ in range(hedger.min_samples):
+        hedger.record(0.01)
+
+    def send(mark_sent):
+        time.sleep(0.1)  # Waiting for a rate-limit token
+        mark_sent()
+        time.sleep(0.005)
+        return "response"
+
+    for _ in range(20):
+        hedger.run(send)
+    assert hedger.stats()["hedged"] == 0, hedger.stats()
+    print(f"Queued requests: {hedger.stats()}")
+
+
+
+def test_failed_copy_does_not_hide_success():
+    """Test that a copy answering successfully wins even when the other one fails in the same round."""
+    hedger = RequestHedger(max_extra_fraction=1.0)
+    for _ in range(hedger.min_samples):
+        hedger.record(0.01)
+    calls = []
+
+    def send(mark_sent):
+        mark_sent()
+        calls.append(None)
+        if len(calls) == 1:
+            # The primary fails right after the hedge is sent and its answer arrives
+            time.sleep(0.05)
+            raise ConnectionError("connection reset")
+        time.sleep(0.02)
+        return "response"
+
+    assert hedger.run(send) == "response"
+    print(f"Failed primary, successful hedge: {hedger.stats()}")
+
+
+if __name__ == "__main__":
+    test_hedging_cuts_tail_latency()
+    test_queue_wait_not_hedged()
+    test_failed_copy_does_not_hide_success()
@@ -0,0 +1,162 @@
+import json
+import re
+import sys
+import tracemalloc
+import uuid
+from typing import Any
+
+from constants import NotionBasePropertyID, NotionCommentPropertyID, NotionPagePropertyID
+
+# Keys whose string values repeat across pages (user IDs, option IDs, option names, colors, types)
+INTERNED_VALUE_KEYS = frozenset({"object", "id", "type", "name", "color", "time_zone", "avatar_url", "workspace_id"})
+
+# Objects whose own ID is unique, so it is not worth interning
+UNIQUE_ID_OBJECTS = frozenset({"page", "block", "comment"})
+
+# Extracted values that are unique per page
+UNIQUE_EXTRACTED_PROPERTIES = frozenset({*NotionBasePropertyID, *NotionPagePropertyID, NotionCommentPropertyID.COMMENT_TEXT})
+
+UUID_PATTERN = re.compile(r"^[0-9a-f]{8}-?[0-9a-f]{4}-?[0-9a-f]{4}-?[0-9a-f]{4}-?[0-9a-f]{12}$")
+
+
+class StringInterner:
+    """
+    Canonicalizes repeated strings across decoded Notion payloads and extracted data.
+
+    JSON decoding creates a new string for every occurrence of a key or value, so thousands of pages
+    hold thousands of copies of the same property names, user IDs, option IDs and colors. The interner
+    keeps one canonical instance per distinct string and returns it for every later occurrence.
+    Values unique to a page (page, block and comment IDs, timestamps, URLs) are left out, and the table
+    holds at most max_entries strings, so a long-running process does not grow with every page it reads.
+
+    Interning extracted values (intern_extracted, records) costs little and only touches data that is
+    kept. Interning while decoding (object_pairs_hook, NotionManager(intern_on_decode=True)) also shrinks
+    raw payloads, by about a quarter, but runs a Python hook per JSON object and rules out orjson:
+    decoding is about 4x slower than the json module alone and 6x slower than orjson (json_codec.benchmark_decode).
+    It only pays off when raw pages are held in large numbers. Measure with benchmark_interning.
+    """
+
+    def __init__(self, max_entries: int = 100_000):
+        self.max_entries = max_entries
+        self._strings = {}
+        self.hits = 0
+
+    def intern(self, value: str | bytes) -> str | bytes:
+        """Returns the canonical instance of a string (or packed ID); new strings are not kept once the table is full."""
+        canonical = self._strings.get(value)
+        if canonical is not None:
+            self.hits += 1
+            return canonical
+        if len(self._strings) < self.max_entries:
+            self._strings[value] = value
+        return value
+
+    def intern_id(self, value: str, pack_uuids: bool = False) -> str | bytes:
+        """Interns an ID, packing it into 16 bytes (see unpack_uuid) when pack_uuids is set and it is a UUID."""
+        if pack_uuids and UUID_PATTERN.match(value):
+            return self.intern(uuid.UUID(value).bytes)
+        return self.intern(value)
+
+    # Decode time
+
+    def object_pairs_hook(self, pairs: list[tuple[str, Any]]) -> dict[str, Any]:
+        """json object_pairs_hook interning every key and the values of INTERNED_VALUE_KEYS (but not unique object IDs)."""
+        intern = self.intern
+        unique_id = any(key == "object" and value in UNIQUE_ID_OBJECTS for key, value in pairs)
+        return {
+            intern(key): intern(value) if type(value) is str and key in INTERNED_VALUE_KEYS and not (unique_id and key == "id") else value
+            for key, value in pairs
+        }
+
+    def loads(self, content: str | bytes) -> Any:
+        """Decodes a JSON document, interning repeated strings on the fly."""
+        return json.loads(content, object_pairs_hook=self.object_pairs_hook)
+
+    # Extraction time
+
+    def intern_value(self, value: Any, pack_uuids: bool = False) -> Any:
+        """Interns an extracted value (string, or list of strings such as people/relation IDs)."""
+        if type(value) is str:
+            return self.intern_id(value, pack_uuids)
+        if type(value) is list:
+            return [self.intern_id(item, pack_uuids) if type(item) is str else item for item in value]
+        return value
+
+    def intern_extracted(self, interpreted_properties: dict[Any, Any]) -> dict[Any, Any]:
+        """Interns the database property values of an extracted dictionary in place."""
+        for prop, value in interpreted_properties.items():
+            if prop not in UNIQUE_EXTRACTED_PROPERTIES:
+                interpreted_properties[prop] = self.intern_value(value)
+        return interpreted_properties
+
+    def stats(self) -> dict[str, int]:
+        """Returns the number of distinct strings kept and of deduplicated occurrences."""
+        return {"unique": len(self._strings), "max_entries": self.max_entries, "hits": self.hits}
+
+
+def unpack_uuid(value: str | bytes) -> str:
+    """Converts a packed 16-byte UUID back to its string form (strings are returned unchanged)."""
+    if type(value) is bytes:
+        return str(uuid.UUID(bytes=value))
+    return value
+
+
+# Benchmarks
+
+def _synthetic_page(index: int) -> dict[str, Any]:
+    """Builds a page payload shaped like a Notion database query result."""
+    user_id = f"ac7a3bd0-c111-4464-8f45-8a857a1a{index % 20:04x}"
+    return {
+        "object": "page",
+        "id": str(uuid.UUID(int=index)),
+        "created_time": "2024-10-01T10:00:00.000Z",
+        "last_edited_time": "2024-10-02T10:00:00.000Z",
+        "created_by": {"object": "user", "id": user_id},
+        "last_edited_by": {"object": "user", "id": user_id},
+        "parent": {"type": "database_id", "database_id": "122acdc2-cc58-80fa-8643-c616c6778bbb"},
+        "cover": None,
+        "icon": {"type": "emoji", "emoji": "📌"},
+        "archived": False,
+        "in_trash": False,
+        "url": f"https://www.notion.so/Card-{index:032x}",
+        "public_url": None,
+        "properties": {
+            "Statut": {"id": "k%3FMm", "type": "status", "status": {"id": "a087807d-e7e9-4e12-8560-44a3d64d6110", "name": "Fait", "color": "green"}},
+            "Équipe": {"id": "rIvf", "type": "select", "select": {"id": "2da75352-d78c-4b75-bd04-3e653eeb71e0", "name": "Design", "color": "default"}},
+            "Responsable": {"id": "xE%3EJ", "type": "people", "people": [{"object": "user", "id": user_id}]},
+            "Tags": {"id": "Tg%3A1", "type": "multi_select", "multi_select": [{"id": "c3a1f7e2-5b1d-4c0e-9f0a-1b2c3d4e5f60", "name": "Backlog", "color": "gray"}]},
+            "Description": {"id": "Dsc1", "type": "rich_text", "rich_text": [{"type": "text", "text": {"content": f"Description of card {index}", "link": None}, "annotations": {"bold": False, "italic": False, "strikethrough": False, "underline": False, "code": False, "color": "default"}, "plain_text": f"Description of card {index}", "href": None}]},
+            "Nom": {"id": "title", "type": "title", "title": [{"type": "text", "text": {"content": f"Card {index}", "link": None}, "annotations": {"bold": False, "italic": False, "strikethrough": False, "underline": False, "code": False, "color": "default"}, "plain_text": f"Card {index}", "href": None}]},
+        },
+    }
+
+
+def benchmark_interning(count: int = 50_000):
+    """Report the memory held by decoded pages with and without interning on a synthetic dataset."""
+    # One payload per query page of 100 results, like _fetch_paginated_data
+    payloads = [
+        json.dumps({"object": "list", "results": [_synthetic_page(i) for i in range(start, min(start + 100, count))]}).encode()
+        for start in range(0, count, 100)
+    ]
+
+    tracemalloc.start()
+    decoded = [json.loads(payload) for payload in payloads]
+    plain_size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del decoded
+
+    interner = StringInterner()
+    tracemalloc.start()
+    decoded = [interner.loads(payload) for payload in payloads]
+    interned_size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del decoded
+
+    print(f"pages          : {count}")
+    print(f"plain decode   : {plain_size / 1024 / 1024:8.1f} MiB")
+    print(f"interned decode: {interned_size / 1024 / 1024:8.1f} MiB")
+    print(f"saved          : {(plain_size - interned_size) / 1024 / 1024:8.1f} MiB ({interner.stats()})")
+
+
+if __name__ == "__main__":
+    benchmark_interning(int(sys.argv[1]) if len(sys.argv) > 1 else 50_000)
@@ -1,10 +1,29 @@
 import requests
+from requests.adapters import HTTPAdapter
 from enum import Enum
-from constants import COMMENTS_URL, DATABASE_ID, DATABASE_URL_TEMPLATE, USER_ID1, NOTION_API_TOKEN, DATABASE_URL, PAGE_URL1, PAGE_URL2, PAGE_URL3, PAGE_URL_TEMPLATE, BLOCK_URL_TEMPLATE, USER_ID2, USER_URL, USER_URL_TEMPLATE, NotionBasePropertyID, NotionCommentPropertyID, NotionDatabasePropertyID, NotionPagePropertyID
+from constants import COMMENTS_URL, DATABASE_ID, DATABASE_URL_TEMPLATE, NOTION_API_TOKEN, DATABASE_URL, PAGE_URL_TEMPLATE, BLOCK_URL_TEMPLATE, USER_URL, USER_URL_TEMPLATE, NotionBasePropertyID, NotionCommentPropertyID, NotionDatabasePropertyID, NotionPagePropertyID
 import re
+import threading
+import time
+from contextlib import contextmanager
+from concurrent.futures import ThreadPoolExecutor
 from typing import Any, Optional
-
-from utils import _extract_data_page_default_properties, _extract_property, _extract_property_content, _display_data_item, _extract_comment_text, _extract_data_base_properties
+from urllib.parse import unquote
+
+from circuit_breaker import CircuitBreaker, CircuitOpenError, StaleCache
+from concurrency import AdaptiveConcurrencyLimiter
+from deadlines import DeadlineExceeded, check_deadline, remaining_time, request_timeout
+from json_codec import combine_pairs_hooks, get_default_codec
+from page_view import PageView
+from planner import PlannedResponse, PlannerStats, RequestPlan, current_plan, endpoint_kind, planning
+from property_items import PropertyItemFetcher
+from rate_limiter import default_rate_limiter
+from records import CommentRecord, build_page_record_class
+from scheduler import RequestScheduler, with_current_context
+from relations import RelationResolver
+from renderer import DataRenderer
+from settings import BLOCK_OBJECT_URL_TEMPLATE, DATABASE_QUERY_URL_TEMPLATE, SEARCH_URL
+from utils import _find_property, _map_property_ids_to_names, _extract_data_page_default_properties, _extract_database_property_value, _display_data_item, _extract_comment_text, _extract_data_base_properties
 
 class NotionManager:
     """
@@ -18,30 +37,186 @@ class NotionManager:
         "Content-Type": "application/json"
     }
 
-    def __init__(self, database_id=None):
+    MAX_THROTTLED_RETRIES = 3
+    DEFAULT_TIMEOUT = 30
+
+    def __init__(self, database_id=None, interner=None, codec=None, projection=None, rate_limiter=None, scheduler=None, concurrency=None,
+                 timeout=DEFAULT_TIMEOUT, hedger=None, circuit_breaker=None, stale_cache=None, planner_stats=None, token=None,
+                 intern_on_decode=False):
         self.database_id = database_id
+        if token:
+            self.HEADERS = {**self.HEADERS, "Authorization": f"Bearer {token}"}
+        self.interner = interner
+        # Interning while decoding forces the json module and is about 4x slower than orjson (see interning.py):
+        # by default the interner only canonicalizes the extracted data that is kept
+        self.intern_on_decode = intern_on_decode
+        self.codec = codec or get_default_codec()
+        self.projection = projection
+        self.rate_limiter = rate_limiter or default_rate_limiter()
+        self.scheduler = scheduler or RequestScheduler(self.rate_limiter)
+        self.concurrency = concurrency or AdaptiveConcurrencyLimiter()
+        self.timeout = timeout
+        self.hedger = hedger
+        self.circuit_breaker = circuit_breaker or CircuitBreaker()
+        self.stale_cache = stale_cache or StaleCache()
+        self.schema_stale = False
+        self.planner_stats = planner_stats or PlannerStats.from_env()
+        self.session = requests.Session()
+        self.session.mount("https://", HTTPAdapter(pool_maxsize=int(self.concurrency.max_limit)))
+        self._user_names = {}
+        self.last_response_bytes = 0
+        self.total_response_bytes = 0
+        self.total_requests = 0
+        self._transport_lock = threading.Lock()
 
     def get_page_id_from_url(self, page_url):
         """Extract the page ID from a Notion page URL."""
         return page_url.split('-')[-1]
 
-    def fetch_url(self, url, params=None):
-        """Helper method to fetch data from a given URL with optional parameters."""
-        response = requests.get(url, headers=self.HEADERS, params=params)
+    def fetch_url(self, url, params=None, stale_fallback=False):
+        """
+        Helper method to fetch data from a given URL with optional parameters.
+        With stale_fallback, the response is kept in the stale cache and served with "stale": True
+        while the circuit breaker is open.
+        """
+        try:
+            response = self._request("GET", url, params=params)
+        except CircuitOpenError:
+            cached = self.stale_cache.get(self._stale_cache_key(url, params)) if stale_fallback else None
+            if cached is None:
+                raise
+            return {**self._decode_body(cached), "stale": True}
         if response.status_code != 200:
             raise Exception(f"Failed to fetch data: {response.text}")
-        return response.json()
+        data = self._decode_response(response)
+        if stale_fallback and current_plan() is None:
+            # The raw body is immutable: callers may change the decoded data, and only a served fallback is decoded again
+            self.stale_cache.put(self._stale_cache_key(url, params), response.content)
+        return data
+
+    def post_url(self, url, data, params=None):
+        """Helper method to post JSON data to a given URL with optional parameters."""
+        response = self._request("POST", url, params=params, json=data)
+        if response.status_code != 200:
+            raise Exception(f"Failed to post data: {response.status_code} - {response.text}")
+        return self._decode_response(response)
+
+    def patch_url(self, url, data):
+        """Helper method to send a PATCH request with JSON data to a given URL."""
+        response = self._request("PATCH", url, json=data)
+        if response.status_code != 200:
+            raise Exception(f"Failed to update data: {response.status_code} - {response.text}")
+        return self._decode_response(response)
+
+    def _request(self, method, url, params=None, json=None):
+        """
+        Send a request to the Notion API and record the size of the response body.
+        With a hedger (hedging.RequestHedger), slow GET requests are duplicated and the first response wins.
+        During a dry run the request is only recorded in the plan and answered with a synthetic response.
+        """
+        plan = current_plan()
+        if plan is not None:
+            return PlannedResponse(plan.record_request(method, url, params, json))
+        send = lambda mark_sent=None: self._send(method, url, params, json, mark_sent)
+        if method == "GET" and self.hedger is not None:
+            response = self.hedger.run(with_current_context(send))
+        else:
+            response = send()
+        with self._transport_lock:
+            self.last_response_bytes = len(response.content)
+            self.total_response_bytes += self.last_response_bytes
+            self.total_requests += 1
+        return response
+
+    def transport_stats(self):
+        """Report the requests answered and the response bytes received so far."""
+        with self._transport_lock:
+            return {"requests": self.total_requests, "response_bytes": self.total_response_bytes}
+
+    def _send(self, method, url, params=None, json=None, mark_sent=None):
+        """
+        Send one request through the manager's session (pooled keep-alive connections), retrying it while it is throttled.
+        The scheduler applies the shared rate limit, serving requests by priority (see scheduler.request_priority).
+        The adaptive concurrency limiter bounds the requests in flight from latency and 429 responses, handing out
+        slots by priority too; throttled requests are retried after the delay given by Retry-After.
+        Each call times out after self.timeout seconds without data (connect or read), or earlier when the operation deadline
+        (see deadlines.deadline) is closer; DeadlineExceeded is raised once the budget is spent.
+        The circuit breaker fails fast with CircuitOpenError after consecutive transport errors, timeouts or 5xx responses
+        (429 responses are retried, not counted).
+        mark_sent, if given, is called right before each HTTP request (the hedger times requests from there).
+        """
+        for attempt in range(self.MAX_THROTTLED_RETRIES + 1):
+            with self.circuit_breaker.guard() as call, self.concurrency.slot() as outcome:
+                with self.scheduler.request():
+                    timeout = request_timeout(self.timeout)
+                    if mark_sent is not None:
+                        mark_sent()
+                    start = time.monotonic()
+                    try:
+                        response = self.session.request(method, url, headers=self.HEADERS, params=params, json=json, timeout=timeout)
+                    except requests.Timeout as error:
+                        if remaining_time() is not None and remaining_time() <= 0:
+                            raise DeadlineExceeded(f"Operation deadline exceeded while waiting for {url}") from error
+                        raise
+                    outcome.latency = time.monotonic() - start
+                outcome.throttled = response.status_code == 429
+                call.failed = response.status_code >= 500
+            if not outcome.throttled:
+                if self.hedger is not None and method == "GET":
+                    self.hedger.record(outcome.latency)
+                self.planner_stats.record_latency(endpoint_kind(method, url), outcome.latency)
+                break
+            if attempt == self.MAX_THROTTLED_RETRIES:
+                break
+            retry_after = float(response.headers.get("Retry-After", 1))
+            check_deadline(retry_after)
+            time.sleep(retry_after)
+        return response
+
+    @staticmethod
+    def _stale_cache_key(url, params):
+        """Key of a read in the stale cache."""
+        return url, repr(sorted((params or {}).items()))
+
+    @contextmanager
+    def dry_run(self, max_block_depth=3):
+        """
+        Record the requests of the operations run inside the block instead of sending them, and yield the plan.
+        plan.summary() estimates their number, duration at the current rate limit and cache hit ratio.
+        """
+        with planning(RequestPlan(self.planner_stats, self.rate_limiter.rate, max_block_depth)) as plan:
+            yield plan
+
+    def _decode_response(self, response):
+        """
+        Decode a JSON response body as UTF-8 with the configured codec, skipping charset detection.
+        The projection spec (pruning) and, with intern_on_decode, the interner are applied while decoding.
+        """
+        return self._decode_body(response.content)
+
+    def _decode_body(self, content):
+        """Decode a raw JSON body (a response, or one kept in the stale cache) like _decode_response."""
+        object_pairs_hook = combine_pairs_hooks(
+            self.projection.object_pairs_hook if self.projection else None,
+            self.interner.object_pairs_hook if self.interner and self.intern_on_decode else None,
+        )
+        return self.codec.loads(content, object_pairs_hook)
 
     # Fetch specific data
 
-    def fetch_db_property_mapping(self, show_options=False):
-        """Fetch and map property IDs to their names from the Notion database."""
+    def fetch_db_properties(self):
+        """Fetch the property schema (name, ID, type and options of each property) of the Notion database."""
         if not self.database_id:
             raise ValueError("Database ID must be provided.")
         
         url = DATABASE_URL_TEMPLATE.format(database_id=self.database_id)
-        database_info = self.fetch_url(url)
-        properties = database_info.get('properties', {})
+        database_info = self.fetch_url(url, stale_fallback=True)
+        self.schema_stale = database_info.get('stale', False)
+        return database_info.get('properties', {})
+
+    def fetch_db_property_mapping(self, show_options=False):
+        """Fetch and map property IDs to their names from the Notion database."""
+        properties = self.fetch_db_properties()
 
         if show_options:
             for property_name, property_data in properties.items():
@@ -66,12 +241,24 @@ class NotionManager:
                             print(prefix + f"  - Name: {option_name}, ID: {option_id}, Color: {option_color}")
         
         # Map property IDs to their respective names
-        return {details['id']: name for name, details in properties.items()}
+        return _map_property_ids_to_names(properties)
 
-    def fetch_page_data(self, page_id):
-        """Fetch the data of a Notion page using its ID."""
+    def fetch_page_data(self, page_id, properties=None):
+        """
+        Fetch the data of a Notion page using its ID.
+        When properties (NotionDatabasePropertyID members) are given, only those are retrieved.
+        """
         url = PAGE_URL_TEMPLATE.format(page_id=page_id)
-        return self.fetch_url(url)
+        return self.fetch_url(url, self._filter_properties_params(properties), stale_fallback=True)
+
+    def fetch_pages_data(self, page_ids, properties=None, max_workers=None):
+        """
+        Fetch several Notion pages concurrently, in the order of page_ids.
+        Requests in flight are bounded by the adaptive concurrency limit, max_workers only caps the thread pool.
+        """
+        with ThreadPoolExecutor(max_workers=max_workers or int(self.concurrency.max_limit)) as executor:
+            fetch_page = with_current_context(lambda page_id: self.fetch_page_data(page_id, properties))
+            return list(executor.map(fetch_page, page_ids))
 
     def fetch_page_data_from_url(self, page_url):
         """Fetch the data of a Notion page from a URL."""
@@ -81,10 +268,41 @@ class NotionManager:
         page_id = self.get_page_id_from_url(page_url)
         return self.fetch_page_data(page_id)
 
+    def update_page_properties(self, page_id, properties):
+        """Update properties of a Notion page (keyed by property name or ID) and return the updated page."""
+        url = PAGE_URL_TEMPLATE.format(page_id=page_id)
+        return self.patch_url(url, {"properties": properties})
+
     def fetch_blocks_data(self, page_id):
         """Fetch all blocks associated with a Notion page."""
         return self._fetch_paginated_data(BLOCK_URL_TEMPLATE.format(page_id=page_id))
 
+    def fetch_block_data(self, block_id):
+        """Fetch a single Notion block using its ID."""
+        url = BLOCK_OBJECT_URL_TEMPLATE.format(block_id=block_id)
+        return self.fetch_url(url)
+
+    def fetch_block_tree(self, block_id, max_workers=None, skip_children_types=()):
+        """
+        Fetch all blocks under a page or block, recursively, with the children of each block nested under 'children'.
+        Children of different blocks are fetched concurrently under the adaptive concurrency limit.
+        Blocks of skip_children_types (e.g. "child_page") are returned without their children.
+        """
+        with ThreadPoolExecutor(max_workers=max_workers or int(self.concurrency.max_limit)) as executor:
+            fetch_children = with_current_context(self.fetch_blocks_data)
+            blocks = self.fetch_blocks_data(block_id)
+            pending = [blocks]
+            while pending:
+                parents = [
+                    block for level in pending for block in level
+                    if block.get('has_children') and block.get('type') not in skip_children_types
+                ]
+                children = list(executor.map(fetch_children, [block['id'] for block in parents]))
+                for parent, parent_children in zip(parents, children):
+                    parent['children'] = parent_children
+                pending = children
+        return blocks
+
     def fetch_blocks_data_from_url(self, page_url):
         """Fetch all blocks associated with a Notion page from its URL."""
         page_id = self.get_page_id_from_url(page_url)
@@ -96,10 +314,26 @@ class NotionManager:
         return [{"id": user["id"], "name": user["name"]} for user in users]
     
     def fetch_user_name(self, user_id):
-        """Fetch the name of a user from their ID."""
-        url = USER_URL_TEMPLATE.format(user_id=user_id)
-        user_data = self.fetch_url(url)
-        return user_data.get("name", "Unknown")
+        """Fetch the name of a user from their ID (cached for the lifetime of the manager)."""
+        if user_id not in self._user_names:
+            url = USER_URL_TEMPLATE.format(user_id=user_id)
+            user_data = self.fetch_url(url)
+            self._user_names[user_id] = user_data.get("name", "Unknown")
+        return self._user_names[user_id]
+
+    def iter_search(self, query=None, filter=None, sort=None, start_cursor=None):
+        """
+        Search the pages and databases shared with the integration and yield each response page, starting from an optional cursor.
+        filter restricts the object type, e.g. {"property": "object", "value": "database"}.
+        """
+        body = {"page_size": 100}
+        if query:
+            body["query"] = query
+        if filter:
+            body["filter"] = filter
+        if sort:
+            body["sort"] = sort
+        return self._iter_paginated_responses(SEARCH_URL, body=body, start_cursor=start_cursor)
 
     def fetch_comments(self, page_id):
         """Fetch all comments associated with a Notion page (ignores block comments)."""
@@ -118,25 +352,55 @@ class NotionManager:
         pattern = re.compile(r"https://www\.notion\.so/[a-zA-Z0-9\-]+-[a-f0-9]{32}")
         return bool(pattern.match(page_url))
 
-    def _fetch_paginated_data(self, url, params=None):
-        """Fetch paginated data from a given Notion API endpoint."""
+    def _filter_properties_params(self, properties):
+        """Translate NotionDatabasePropertyID members into 'filter_properties' query parameters."""
+        if properties is None:
+            return None
+        # Property IDs are URL-encoded in the schema, requests encodes them again
+        return {"filter_properties": [unquote(prop.value) for prop in properties]}
+
+    def _fetch_paginated_data(self, url, params=None, body=None):
+        """
+        Fetch paginated data from a given Notion API endpoint.
+        When a body is given the endpoint is queried with POST (e.g. database queries).
+        """
         data = []
+        for response in self._iter_paginated_responses(url, params, body):
+            data.extend(response.get("results", []))
+        return data
+
+    def _iter_paginated_responses(self, url, params=None, body=None, start_cursor=None):
+        """
+        Yield each response of a paginated Notion API endpoint, starting from an optional cursor.
+        Each response carries 'results', 'has_more' and 'next_cursor', so callers can checkpoint.
+        Complete listings are counted in the planner stats to size later dry runs.
+        """
+        params = dict(params) if params else {}
         has_more = True
-        start_cursor = None
+        complete_listing = start_cursor is None and current_plan() is None
+        items = with_children = 0
 
         while has_more:
             if start_cursor:
-                if params is None:
-                    params = {}
-                params['start_cursor'] = start_cursor
+                if body is not None:
+                    body = {**body, 'start_cursor': start_cursor}
+                else:
+                    params['start_cursor'] = start_cursor
             
-            response = self.fetch_url(url, params)
-            data.extend(response.get("results", []))
+            if body is not None:
+                response = self.post_url(url, body, params or None)
+            else:
+                response = self.fetch_url(url, params or None)
+            results = response.get("results", [])
+            items += len(results)
+            with_children += sum(1 for item in results if item.get("has_children"))
+            yield response
             has_more = response.get("has_more", False)
             start_cursor = response.get("next_cursor")
 
-        return data
-    
+        if complete_listing:
+            self.planner_stats.record_listing(endpoint_kind("POST" if body is not None else "GET", url), items, with_children)
+
     def _extract_comment_data(self, comment_data: dict[str, Any], for_display: bool = False) -> dict[str, Any]:
         """
         Extracts and interprets content from a Notion comment.
@@ -165,31 +429,115 @@ class NotionManager:
         return interpreted_properties
 
 class NotionPageManager(NotionManager):
-    """Manager class for handling Notion pages and related operations."""
-
-    def __init__(self, database_id: str):
-        super().__init__(database_id)
-        self.property_mapping = self.fetch_db_property_mapping()
+    """
+    Manager class for handling Notion pages and related operations.
+    The database schema is fetched on creation, unless one is given as db_properties (the 'properties' of a
+    database, as returned by fetch_db_properties), which builds the manager without any request, e.g. offline.
+    """
 
-    def _extract_data_page_database_properties(self, properties_data: dict[str, Any], for_display: bool = False) -> dict[NotionDatabasePropertyID, Any]:
+    def __init__(self, database_id: str, db_properties: Optional[dict[str, Any]] = None, **kwargs):
+        super().__init__(database_id, **kwargs)
+        self.property_items = PropertyItemFetcher(self)
+        self.relation_resolver = RelationResolver(self)
+        self.schema_generation = 0
+        self._schema_lock = threading.Lock()
+        self._renames_seen = set()
+        self.refresh_schema(db_properties)
+
+    def refresh_schema(self, db_properties: Optional[dict[str, Any]] = None):
+        """Fetch the database schema (or use the given one) and rebuild everything derived from it."""
+        self.db_properties = db_properties if db_properties is not None else self.fetch_db_properties()
+        self.property_mapping = _map_property_ids_to_names(self.db_properties)
+        self.page_record_class = build_page_record_class(self.db_properties)
+        self.schema_generation += 1
+
+    def _check_property_names(self, properties_data: dict[str, Any]):
+        """
+        Detect properties renamed since the schema was fetched (found by ID under another name in the page)
+        and refresh the schema once. Extractions running concurrently share a single refresh: a thread
+        that waited for the lock while another one refreshed does not refresh again. Each rename only
+        triggers one refresh, even if the page payload carrying it is older than the schema.
+        """
+        generation = self.schema_generation
+        renames = []
+        for prop in NotionDatabasePropertyID:
+            prop_name = self.property_mapping.get(prop.value)
+            property_data = properties_data.get(prop_name)
+            if property_data is not None and property_data.get('id') in (prop.value, None):
+                continue
+            for name, candidate in properties_data.items():
+                if candidate.get('id') == prop.value and (prop.value, name) not in self._renames_seen:
+                    renames.append((prop.value, name))
+        if not renames:
+            return
+
+        with self._schema_lock:
+            self._renames_seen.update(renames)
+            if self.schema_generation != generation:
+                return
+            try:
+                self.refresh_schema()
+            except Exception:
+                # Extraction resolves properties by ID anyway; keep the cached schema until the next rename
+                self.schema_stale = True
+
+    def query_database(self, filter=None, sorts=None, properties=None):
+        """
+        Query the Notion database and return all matching pages.
+        When properties (NotionDatabasePropertyID members) are given, only those are retrieved.
+        """
+        pages = []
+        for response in self.iter_query_database(filter, sorts, properties):
+            pages.extend(response.get("results", []))
+        return pages
+
+    def iter_query_database(self, filter=None, sorts=None, properties=None, start_cursor=None):
+        """Query the Notion database and yield each response page (up to 100 results), starting from an optional cursor."""
+        url = DATABASE_QUERY_URL_TEMPLATE.format(database_id=self.database_id)
+        body = {"page_size": 100}
+        if filter:
+            body["filter"] = filter
+        if sorts:
+            body["sorts"] = sorts
+        return self._iter_paginated_responses(url, self._filter_properties_params(properties), body, start_cursor)
+
+    def update_status(self, page_id: str, status_name: str) -> dict[str, Any]:
+        """Set the status of a card to one of the options of the status property, and return the updated page."""
+        property_name = self.property_mapping.get(NotionDatabasePropertyID.STATUS.value)
+        if property_name is None:
+            raise ValueError("The database has no status property.")
+        property_type = self.db_properties[property_name]['type']
+        options = [option['name'] for option in self.db_properties[property_name].get(property_type, {}).get('options', [])]
+        if options and status_name not in options:
+            raise ValueError(f"Unknown status: {status_name}. Expected one of {options}")
+        return self.update_page_properties(page_id, {property_name: {property_type: {"name": status_name}}})
+
+    def _filter_properties_params(self, properties):
+        """Translate NotionDatabasePropertyID members into 'filter_properties', checking them against the cached schema."""
+        if properties is not None:
+            unknown_properties = [prop.name for prop in properties if prop.value not in self.property_mapping]
+            if unknown_properties:
+                raise ValueError(f"Properties not found in the database schema: {unknown_properties}")
+        return super()._filter_properties_params(properties)
+
+    def _extract_data_page_database_properties(self, properties_data: dict[str, Any], for_display: bool = False,
+                                               relation_titles: Optional[dict[str, str]] = None) -> dict[NotionDatabasePropertyID, Any]:
         """
         Extracts properties from page_data['properties'] based on NotionDatabasePropertyID.
+        Properties are resolved by their stable ID, so renamed properties are still extracted.
         Returns a dictionary with extracted properties.
         """
         interpreted_properties = {}
 
         for prop in NotionDatabasePropertyID:
-            prop_name = self.property_mapping.get(prop.value)
-            property_data = properties_data.get(prop_name)
+            property_data = _find_property(properties_data, self.property_mapping.get(prop.value), prop.value)
             if property_data:
-                property_type = property_data['type']
-                content = _extract_property_content(property_data)
-                interpreted_value = _extract_property(property_type, content, for_display)
-                interpreted_properties[prop] = interpreted_value
+                interpreted_properties[prop] = _extract_database_property_value(property_data, for_display, relation_titles)
 
         return interpreted_properties
     
-    def _extract_page_data(self, page_data: dict[str, Any], for_display: bool = False) -> dict[NotionPagePropertyID, Any]:
+    def _extract_page_data(self, page_data: dict[str, Any], for_display: bool = False,
+                           relation_titles: Optional[dict[str, str]] = None) -> dict[NotionPagePropertyID, Any]:
         """
         Extracts and interprets properties from a Notion page.
         """
@@ -205,33 +553,66 @@ class NotionPageManager(NotionManager):
 
         # Step 3: Extract properties from NotionDatabasePropertyID
         properties = page_data.get('properties', {})
-        database_properties = self._extract_data_page_database_properties(properties, for_display)
+        database_properties = self._extract_data_page_database_properties(properties, for_display, relation_titles)
         interpreted_properties.update(database_properties)
 
         return interpreted_properties
 
-    def extract_data(self, page_or_comment_data: dict[str, Any]| list[dict[str, Any]], for_display: bool = False) -> dict[str, Any]| list[dict[str, Any]]:
+    def extract_data(self, page_or_comment_data: dict[str, Any]| list[dict[str, Any]], for_display: bool = False, lazy: bool = False, as_records: bool = False) -> dict[str, Any]| list[dict[str, Any]]:
         """
         General function to extract data from either a Notion page or a comment.
         It uses the 'object' field in the data to determine what to extract.
+        With lazy=True, pages are wrapped in a PageView that only extracts the properties actually read.
+        With as_records=True, pages and comments are returned as compact __slots__ records (see records.py).
+        Property values truncated at 25 items are completed for the whole batch first (see property_items.py),
+        or when first read from a PageView, and for display, the titles of related pages are resolved (see relations.py).
         """
+        if lazy and as_records:
+            raise ValueError("lazy and as_records cannot be combined.")
+
+        if not lazy:
+            page_or_comment_data = self.property_items.complete(page_or_comment_data)
+        relation_titles = self.relation_resolver.resolve(page_or_comment_data) if for_display else None
         if type(page_or_comment_data) is list:
-            return [self.extract_data(data, for_display) for data in page_or_comment_data]
-        
+            return [self._extract_item(data, for_display, lazy, as_records, relation_titles) for data in page_or_comment_data]
+        return self._extract_item(page_or_comment_data, for_display, lazy, as_records, relation_titles)
+
+    def _extract_item(self, page_or_comment_data: dict[str, Any], for_display: bool, lazy: bool, as_records: bool,
+                      relation_titles: Optional[dict[str, str]] = None) -> Any:
+        """Extracts a single page or comment (see extract_data)."""
         object_type = page_or_comment_data.get('object')
         if object_type == 'page':
-            return self._extract_page_data(page_or_comment_data, for_display)
+            self._check_property_names(page_or_comment_data.get('properties', {}))
+            if lazy:
+                return PageView(page_or_comment_data, self.property_mapping, for_display, self.property_items, relation_titles)
+            if as_records:
+                return self.page_record_class.from_page(page_or_comment_data, for_display, self.interner, relation_titles)
+            return self._intern_extracted(self._extract_page_data(page_or_comment_data, for_display, relation_titles))
         elif object_type == 'comment':
-            return self._extract_comment_data(page_or_comment_data, for_display)
+            comment_data = self._intern_extracted(self._extract_comment_data(page_or_comment_data, for_display))
+            return CommentRecord.from_dict(comment_data) if as_records else comment_data
         else:
             raise ValueError(f"Unsupported object type: {object_type}")
 
-    def display_data(self, extracted_data_list: list[dict[str, Any]], detailed: bool = False):
+    def _intern_extracted(self, interpreted_properties: dict[Any, Any]) -> dict[Any, Any]:
+        """Canonicalizes repeated strings of extracted data when an interner is configured."""
+        if self.interner:
+            return self.interner.intern_extracted(interpreted_properties)
+        return interpreted_properties
+
+    def display_data(self, extracted_data_list: list[dict[str, Any]], detailed: bool = False, format: Optional[str] = None, stream=None):
         """
         General function to display either page or comment data.
         Uses the 'object' field to determine whether to display a page or comment.
+        With a format ('table', 'jsonl' or 'csv'), items are streamed through a DataRenderer instead,
+        which also accepts generators.
         """
-        
+        if format:
+            # Single items (dict, PageView, record) have a get method, lists and generators do not
+            items = [extracted_data_list] if hasattr(extracted_data_list, 'get') else extracted_data_list
+            DataRenderer(format, stream).render(items)
+            return
+
         if type(extracted_data_list) is list:
             for extracted_data in extracted_data_list:
                 _display_data_item(extracted_data, detailed, separator=False)
@@ -242,7 +623,6 @@ class NotionPageManager(NotionManager):
         """
         Adds a comment to a Notion page with optional user mentions.
         """
-        url = "https://api.notion.com/v1/comments"
         rich_text = []
         parts = comment_text.split("@")
 
@@ -261,14 +641,7 @@ class NotionPageManager(NotionManager):
             "rich_text": rich_text
         }
 
-        response = requests.post(url, headers={
-            "Authorization": f"Bearer {NOTION_API_TOKEN}",
-            "Content-Type": "application/json",
-            "Notion-Version": "2022-06-28"
-        }, json=data)
-
-        if response.status_code != 200:
-            raise Exception(f"Failed to add comment: {response.status_code} - {response.text}")
+        return self.post_url(COMMENTS_URL, data)
 
 
 
@@ -282,8 +655,21 @@ def test_fetch_db_property_mapping():
     print(property_mapping)
 
 
+def test_query_database_filter_properties():
+    """Test querying the database with and without filter_properties and compare response sizes."""
+    page_manager = NotionPageManager(DATABASE_ID)
+    properties = [NotionDatabasePropertyID.NAME, NotionDatabasePropertyID.STATUS]
+
+    for label, selected_properties in (("all properties", None), ("filtered", properties)):
+        start_bytes = page_manager.total_response_bytes
+        pages = page_manager.query_database(properties=selected_properties)
+        print(f"{label}: {len(pages)} pages, {page_manager.total_response_bytes - start_bytes} bytes")
+
+
 def test_display_page():
     """Test fetching and displaying a Notion page with detailed properties."""
+    from constants import PAGE_URL2
+
     page_manager = NotionPageManager(DATABASE_ID)
     page_id = page_manager.get_page_id_from_url(PAGE_URL2)
     page_data = page_manager.fetch_page_data(page_id)
@@ -299,6 +685,8 @@ def test_display_page():
 
 def test_display_list_page():
     """Test fetching and displaying multiple Notion pages as a list with detailed properties."""
+    from constants import PAGE_URL1, PAGE_URL2, PAGE_URL3
+
     page_manager = NotionPageManager(DATABASE_ID)
     page_urls = [PAGE_URL1, PAGE_URL2, PAGE_URL3]
 
@@ -315,6 +703,8 @@ def test_display_list_page():
 
 def test_display_comments():
     """Test fetching and displaying comments for a given Notion page."""
+    from constants import PAGE_URL3
+
     detailed = True
     for_display = True
     comment_manager = NotionPageManager(DATABASE_ID)
@@ -330,6 +720,8 @@ def test_display_comments():
 
 def test_add_comment():
     """Test adding a comment to a Notion page."""
+    from constants import PAGE_URL2
+
     comment_manager = NotionPageManager(DATABASE_ID)
     page_id = comment_manager.get_page_id_from_url(PAGE_URL2)
     comment_manager.add_comment_to_page(page_id, "This is a test comment.")
@@ -344,6 +736,8 @@ def test_fetch_all_user_ids():
 
 def test_add_comment_with_mention():
     """Test adding a comment with mentions to a Notion page."""
+    from constants import PAGE_URL3, USER_ID1, USER_ID2
+
     comment_manager = NotionPageManager(DATABASE_ID)
     page_id = comment_manager.get_page_id_from_url(PAGE_URL3)
     comment_manager.add_comment_to_page(
@@ -358,6 +752,7 @@ if __name__ == "__main__":
     # test_display_page()
     # test_display_list_page()
     test_fetch_db_property_mapping()
+    # test_query_database_filter_properties()
     # test_add_comment()
     # test_add_comment_with_mention()
     # test_display_comments()
@@ -0,0 +1,109 @@
+from typing import Any, Iterator, Optional
+
+from constants import NotionBasePropertyID, NotionDatabasePropertyID, NotionPagePropertyID
+from property_items import _is_truncated
+from utils import _extract_database_property_value, _find_property
+
+VIEW_PROPERTIES = (*NotionBasePropertyID, *NotionPagePropertyID, *NotionDatabasePropertyID)
+
+
+class _LazyProperty:
+    """Descriptor extracting a property on first access and memoizing it in a slot."""
+
+    def __init__(self, prop: Any, slot: Any):
+        self.prop = prop
+        self.slot = slot
+
+    def __get__(self, view: "PageView", owner: type = None) -> Any:
+        if view is None:
+            return self
+        try:
+            return self.slot.__get__(view, owner)
+        except AttributeError:
+            value = view._extract(self.prop)
+            self.slot.__set__(view, value)
+            return value
+
+
+class PageView:
+    """
+    Read-only view over a raw Notion page, extracting properties lazily.
+
+    Each property of NotionBasePropertyID, NotionPagePropertyID and NotionDatabasePropertyID is exposed
+    as a lowercase attribute (view.id, view.status, ...) and is only extracted on first access.
+    The view also supports view.get(prop) and view[prop] with enum members, so it can be passed
+    wherever an extracted page dictionary is expected.
+    With a property_items fetcher (property_items.PropertyItemFetcher), a value truncated at 25 items is
+    completed when it is first read. For display, related pages are shown by their title in relation_titles.
+    """
+
+    __slots__ = ('_page_data', '_property_mapping', '_for_display', '_property_items', '_relation_titles', *(f"_v_{prop.name.lower()}" for prop in VIEW_PROPERTIES))
+
+    def __init__(self, page_data: dict[str, Any], property_mapping: dict[str, str], for_display: bool = False,
+                 property_items: Any = None, relation_titles: Optional[dict[str, str]] = None):
+        self._page_data = page_data
+        self._property_mapping = property_mapping
+        self._for_display = for_display
+        self._property_items = property_items
+        self._relation_titles = relation_titles
+
+    @property
+    def raw(self) -> dict[str, Any]:
+        """Returns the raw page JSON."""
+        return self._page_data
+
+    def _extract(self, prop: Any) -> Any:
+        """Extracts a single property from the raw page."""
+        if type(prop) is not NotionDatabasePropertyID:
+            return self._page_data.get(prop.value)
+
+        property_data = _find_property(self._page_data.get('properties', {}), self._property_mapping.get(prop.value), prop.value)
+        if not property_data:
+            return None
+        if self._property_items is not None and _is_truncated(property_data):
+            # The view keeps the completed copy, the page it was given is left as is
+            self._page_data = self._property_items.complete(self._page_data, [property_data['id']])
+            property_data = _find_property(self._page_data.get('properties', {}), self._property_mapping.get(prop.value), prop.value)
+        return _extract_database_property_value(property_data, self._for_display, self._relation_titles)
+
+    # Dictionary-like access
+
+    def get(self, prop: Any, default: Any = None) -> Any:
+        """Returns the value of an enum property, or default if it is unknown or missing."""
+        attribute = _ATTRIBUTE_NAMES.get(prop)
+        if attribute is None:
+            return default
+        value = getattr(self, attribute)
+        if value is None and type(prop) is NotionDatabasePropertyID:
+            # Missing database properties are absent from extracted dictionaries
+            return default
+        return value
+
+    def __getitem__(self, prop: Any) -> Any:
+        attribute = _ATTRIBUTE_NAMES.get(prop)
+        if attribute is None:
+            raise KeyError(prop)
+        return getattr(self, attribute)
+
+    def __contains__(self, prop: Any) -> bool:
+        return prop in _ATTRIBUTE_NAMES
+
+    def __iter__(self) -> Iterator[Any]:
+        return iter(VIEW_PROPERTIES)
+
+    def to_dict(self) -> dict[Any, Any]:
+        """Extracts every property, like NotionPageManager._extract_page_data."""
+        return {prop: self[prop] for prop in VIEW_PROPERTIES}
+
+    def __repr__(self) -> str:
+        return f"PageView(id={self._page_data.get('id')!r})"
+
+
+_ATTRIBUTE_NAMES = {}
+for _prop in VIEW_PROPERTIES:
+    _attribute = _prop.name.lower()
+    if _attribute in _ATTRIBUTE_NAMES.values():
+        raise ValueError(f"Duplicate page view attribute: {_attribute}")
+    _ATTRIBUTE_NAMES[_prop] = _attribute
+    setattr(PageView, _attribute, _LazyProperty(_prop, PageView.__dict__[f"_v_{_attribute}"]))
+del _prop, _attribute
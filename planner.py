@@ -0,0 +1,254 @@
+import contextvars
+import json
+import os
+import re
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+from typing import Any, Iterator, Optional
+from urllib.parse import urlparse
+
+# Latency assumed for request kinds never observed
+DEFAULT_LATENCY = 0.4
+PAGE_SIZE = 100
+
+LISTING_KINDS = ("database_query", "block_children", "comments", "users", "search")
+LISTING_OBJECTS = {"database_query": "page", "block_children": "block", "comments": "comment", "users": "user", "search": "page"}
+
+_ENDPOINT_PATTERNS = [
+    (re.compile(r"^/v1/databases/[^/]+/query$"), "database_query"),
+    (re.compile(r"^/v1/databases/[^/]+$"), "database"),
+    (re.compile(r"^/v1/pages/[^/]+/properties/[^/]+$"), "page_property"),
+    (re.compile(r"^/v1/pages/[^/]+$"), "page"),
+    (re.compile(r"^/v1/blocks/[^/]+/children$"), "block_children"),
+    (re.compile(r"^/v1/blocks/[^/]+$"), "block"),
+    (re.compile(r"^/v1/comments$"), "comments"),
+    (re.compile(r"^/v1/users$"), "users"),
+    (re.compile(r"^/v1/users/[^/]+$"), "user"),
+    (re.compile(r"^/v1/search$"), "search"),
+]
+_PLANNED_ID = re.compile(r"planned-(\d+)-")
+_PLANNED_CURSOR = re.compile(r"planned-\d+-cursor-(\d+)")
+
+_current_plan = contextvars.ContextVar("notion_request_plan", default=None)
+
+
+def endpoint_kind(method: str, url: str) -> str:
+    """Classifies a request by endpoint, e.g. 'database_query' or 'block_children'."""
+    path = urlparse(url).path
+    for pattern, kind in _ENDPOINT_PATTERNS:
+        if pattern.match(path):
+            if kind == "comments" and method == "POST":
+                return "comment_create"
+            return kind
+    return "other"
+
+
+class PlannerStats:
+    """
+    Counts observed by real runs and used to size dry runs: items per listing, share of blocks with
+    children, and mean latency of each kind of request. Persisted to 'path' (JSON) when one is given,
+    e.g. from NOTION_PLANNER_STATS, so plans use the counts of previous jobs.
+    """
+
+    SAVE_INTERVAL = 5.0
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = path
+        self._lock = threading.Lock()
+        self._saved_at = 0.0
+        self._stats = {}
+        if path and os.path.exists(path):
+            with open(path, encoding="utf-8") as stats_file:
+                self._stats = json.load(stats_file)
+
+    @classmethod
+    def from_env(cls) -> "PlannerStats":
+        """Returns stats persisted to NOTION_PLANNER_STATS, in memory only when it is not set."""
+        return cls(os.environ.get("NOTION_PLANNER_STATS"))
+
+    def record_listing(self, kind: str, items: int, with_children: int = 0):
+        """Records a complete listing (all its pages) of 'items' items, 'with_children' of which have children."""
+        with self._lock:
+            stats = self._stats.setdefault(kind, {})
+            stats["listings"] = stats.get("listings", 0) + 1
+            stats["items"] = stats.get("items", 0) + items
+            stats["with_children"] = stats.get("with_children", 0) + with_children
+        self._save_if_due()
+
+    def record_latency(self, kind: str, latency: float):
+        """Records the latency of an answered request."""
+        with self._lock:
+            stats = self._stats.setdefault(kind, {})
+            stats["requests"] = stats.get("requests", 0) + 1
+            stats["latency"] = stats.get("latency", 0.0) + latency
+        self._save_if_due()
+
+    def mean_items(self, kind: str) -> Optional[float]:
+        """Returns the mean number of items per listing, None if this kind was never listed."""
+        stats = self._stats.get(kind, {})
+        return stats["items"] / stats["listings"] if stats.get("listings") else None
+
+    def children_fraction(self, kind: str) -> float:
+        """Returns the share of listed items that have children."""
+        stats = self._stats.get(kind, {})
+        return stats["with_children"] / stats["items"] if stats.get("items") else 0.0
+
+    def mean_latency(self, kind: str) -> float:
+        """Returns the mean latency of a kind of request, DEFAULT_LATENCY if it was never sent."""
+        stats = self._stats.get(kind, {})
+        return stats["latency"] / stats["requests"] if stats.get("requests") else DEFAULT_LATENCY
+
+    def _save_if_due(self):
+        """Persists the stats atomically, at most every SAVE_INTERVAL seconds."""
+        if not self.path or time.monotonic() - self._saved_at < self.SAVE_INTERVAL:
+            return
+        with self._lock:
+            self._saved_at = time.monotonic()
+            snapshot = json.dumps(self._stats)
+        tmp_path = f"{self.path}.{threading.get_ident()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as stats_file:
+            stats_file.write(snapshot)
+        os.replace(tmp_path, self.path)
+
+
+class RequestPlan:
+    """
+    Requests an operation would send, recorded by a dry run instead of being sent.
+
+    Each planned request answers with a synthetic response sized from PlannerStats (listings return as
+    many items and pages as previously observed, blocks have children in the observed proportion, up to
+    max_block_depth), so operations run their normal code path and the plan captures their request graph:
+    a request depends on the request that returned the ID or cursor it uses. Caches call
+    record_cache_lookup() so the plan also reports the share of reads they would serve.
+    """
+
+    def __init__(self, stats: PlannerStats, rate: float, max_block_depth: int = 3):
+        self.stats = stats
+        self.rate = rate
+        self.max_block_depth = max_block_depth
+        self.requests = []
+        self.cache_lookups = Counter()
+        self._children_carry = 0.0
+        self._lock = threading.Lock()
+
+    def record_request(self, method: str, url: str, params: Optional[dict[str, Any]] = None,
+                       body: Optional[dict[str, Any]] = None) -> dict[str, Any]:
+        """Adds a request to the plan and returns its synthetic response payload."""
+        kind = endpoint_kind(method, url)
+        reference = json.dumps([url, params, body], default=str)
+        parent_match = _PLANNED_ID.search(reference)
+        with self._lock:
+            node = len(self.requests)
+            parent = int(parent_match.group(1)) if parent_match else None
+            depth = self.requests[parent]["depth"] + 1 if parent is not None and kind == "block_children" else 0
+            self.requests.append({"id": node, "parent": parent, "method": method, "kind": kind, "url": url, "depth": depth})
+        return self._synthetic_response(node, kind, depth, reference)
+
+    def record_cache_lookup(self, kind: str, hit: bool):
+        """Records a read a cache would serve (hit) or forward to the API (miss)."""
+        with self._lock:
+            self.cache_lookups[(kind, hit)] += 1
+
+    def _synthetic_response(self, node: int, kind: str, depth: int, reference: str) -> dict[str, Any]:
+        """Builds a response shaped like the real one, with planned IDs and cursors."""
+        if kind not in LISTING_KINDS:
+            return {"object": kind, "id": f"planned-{node}-0", "properties": {}}
+
+        total = round(self.stats.mean_items(kind) or 0)
+        cursor_match = _PLANNED_CURSOR.search(reference)
+        offset = int(cursor_match.group(1)) if cursor_match else 0
+        count = max(0, min(PAGE_SIZE, total - offset))
+        with_children = 0
+        if kind == "block_children" and depth < self.max_block_depth:
+            # Carry the fractional part over so small listings still get their share of children
+            with self._lock:
+                expected = count * self.stats.children_fraction(kind) + self._children_carry
+                with_children = min(count, int(expected))
+                self._children_carry = expected - with_children
+        has_more = offset + PAGE_SIZE < total
+        return {
+            "object": "list",
+            "results": [
+                {"object": LISTING_OBJECTS[kind], "id": f"planned-{node}-{index}", "has_children": index < with_children, "properties": {}}
+                for index in range(count)
+            ],
+            "has_more": has_more,
+            "next_cursor": f"planned-{node}-cursor-{offset + PAGE_SIZE}" if has_more else None,
+        }
+
+    def summary(self) -> dict[str, Any]:
+        """
+        Estimates the cost of the plan: number of calls by kind, duration at the current rate limit
+        (the longest of the rate-limited time and the critical path of dependent requests),
+        cache hit ratio, and the kinds sized without observed counts.
+        """
+        by_kind = Counter(request["kind"] for request in self.requests)
+        finish_times = []
+        for request in self.requests:
+            start = finish_times[request["parent"]] if request["parent"] is not None else 0.0
+            finish_times.append(start + self.stats.mean_latency(request["kind"]))
+
+        hits = sum(count for (_, hit), count in self.cache_lookups.items() if hit)
+        lookups = sum(self.cache_lookups.values())
+        rate_limit_seconds = len(self.requests) / self.rate
+        critical_path_seconds = max(finish_times, default=0.0)
+        return {
+            "calls": len(self.requests),
+            "calls_by_kind": dict(by_kind),
+            "rate_limit_seconds": round(rate_limit_seconds, 1),
+            "critical_path_seconds": round(critical_path_seconds, 1),
+            "estimated_seconds": round(max(rate_limit_seconds, critical_path_seconds), 1),
+            "cache_lookups": lookups,
+            "cache_hit_ratio": round(hits / lookups, 3) if lookups else None,
+            "kinds_without_stats": sorted(kind for kind in by_kind if kind in LISTING_KINDS and self.stats.mean_items(kind) is None),
+        }
+
+
+def current_plan() -> Optional[RequestPlan]:
+    """Returns the plan recording the requests of the current context, None outside of a dry run."""
+    return _current_plan.get()
+
+
+@contextmanager
+def planning(plan: RequestPlan) -> Iterator[RequestPlan]:
+    """Records every request made inside the block (and thread pools wrapped with with_current_context) in the plan."""
+    token = _current_plan.set(plan)
+    try:
+        yield plan
+    finally:
+        _current_plan.reset(token)
+
+
+class PlannedResponse:
+    """Stands in for a requests.Response during a dry run."""
+
+    status_code = 200
+    text = ""
+    headers = {}
+
+    def __init__(self, payload: dict[str, Any]):
+        self.content = json.dumps(payload).encode("utf-8")
+
+
+# Tests
+
+def test_plan_block_crawl():
+    """Test planning a block crawl from observed counts: 40 top-level blocks, a quarter of them with children."""
+    stats = PlannerStats()
+    stats.record_listing("block_children", 40, 10)
+    stats.record_latency("block_children", 0.3)
+    plan = RequestPlan(stats, rate=3, max_block_depth=2)
+
+    pending = [plan.record_request("GET", "https://api.notion.com/v1/blocks/root/children")]
+    while pending:
+        response = pending.pop()
+        for block in response["results"]:
+            if block["has_children"]:
+                pending.append(plan.record_request("GET", f"https://api.notion.com/v1/blocks/{block['id']}/children"))
+    print(plan.summary())
+
+
+if __name__ == "__main__":
+    test_plan_block_crawl()
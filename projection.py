@@ -0,0 +1,80 @@
+import json
+import sys
+import tracemalloc
+from typing import Any, Iterable, Optional
+
+from constants import NotionBasePropertyID, NotionDatabasePropertyID, NotionPagePropertyID
+
+# Keys of rich text objects that extract_data never reads
+DEFAULT_DROPPED_KEYS = frozenset({"annotations"})
+
+
+class ProjectionSpec:
+    """
+    Describes which parts of a page payload are kept while decoding.
+
+    Page objects only keep the listed base/page properties, 'properties' only keeps the listed
+    database properties (matched by property ID), and DEFAULT_DROPPED_KEYS (rich text annotations)
+    are removed from every object. Other objects (databases, comments, blocks, users) are left
+    untouched apart from the dropped keys.
+
+    The spec is applied through a json object_pairs_hook: objects are built innermost first, so each
+    pruned subtree is released as soon as its parent object is decoded instead of being retained
+    for the lifetime of the response.
+    """
+
+    def __init__(self, database_properties: Optional[Iterable[NotionDatabasePropertyID]] = None,
+                 base_properties: Iterable[NotionBasePropertyID] = tuple(NotionBasePropertyID),
+                 page_properties: Iterable[NotionPagePropertyID] = (),
+                 dropped_keys: Iterable[str] = DEFAULT_DROPPED_KEYS):
+        if database_properties is None:
+            database_properties = NotionDatabasePropertyID
+        self.database_properties = tuple(database_properties)
+        self.property_ids = frozenset(prop.value for prop in self.database_properties)
+        self.page_keys = frozenset(
+            [prop.value for prop in base_properties] + [prop.value for prop in page_properties] + ["properties"]
+        )
+        self.dropped_keys = frozenset(dropped_keys)
+
+    def object_pairs_hook(self, pairs: list[tuple[str, Any]]) -> dict[str, Any]:
+        """json object_pairs_hook pruning every decoded object according to the spec."""
+        dropped_keys = self.dropped_keys
+        result = {key: value for key, value in pairs if key not in dropped_keys}
+        if result.get('object') != 'page':
+            return result
+
+        page_keys = self.page_keys
+        page = {key: value for key, value in result.items() if key in page_keys}
+        properties = page.get('properties')
+        if properties:
+            property_ids = self.property_ids
+            page['properties'] = {
+                name: property_data for name, property_data in properties.items()
+                if property_data.get('id') in property_ids
+            }
+        return page
+
+
+# Benchmarks
+
+def benchmark_projection(count: int = 20_000):
+    """Compare the memory retained by decoded pages with and without a projection spec."""
+    from interning import _synthetic_page
+
+    payloads = [
+        json.dumps({"object": "list", "results": [_synthetic_page(i) for i in range(start, min(start + 100, count))]}).encode()
+        for start in range(0, count, 100)
+    ]
+    spec = ProjectionSpec([NotionDatabasePropertyID.STATUS, NotionDatabasePropertyID.NAME])
+
+    for label, object_pairs_hook in (("full", None), ("projected", spec.object_pairs_hook)):
+        tracemalloc.start()
+        decoded = [json.loads(payload, object_pairs_hook=object_pairs_hook) for payload in payloads]
+        size, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        print(f"{label:10}: {size / 1024 / 1024:8.1f} MiB retained, {peak / 1024 / 1024:8.1f} MiB peak for {count} pages")
+        del decoded
+
+
+if __name__ == "__main__":
+    benchmark_projection(int(sys.argv[1]) if len(sys.argv) > 1 else 20_000)
@@ -0,0 +1,144 @@
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Iterable, Optional
+
+from planner import current_plan
+from scheduler import with_current_context
+from settings import PAGE_PROPERTY_URL_TEMPLATE
+
+# Page objects return at most 25 items of these property types
+PAGINATED_PROPERTY_TYPES = ("relation", "people", "rich_text", "title")
+PAGE_OBJECT_ITEM_LIMIT = 25
+
+
+class PropertyItemFetcher:
+    """
+    Completes property values truncated in page objects.
+
+    Page objects return at most 25 items of relation, people, rich_text and title properties. A property
+    is treated as truncated when it reports has_more, or, when it does not report it (people and text),
+    when it holds exactly 25 items; its full value is then read from GET /pages/{id}/properties/{property_id}
+    with pagination. The follow-up reads of a whole batch of pages are sent concurrently, and full values
+    are cached by (page, property, last_edited_time), so an unchanged page is never read twice.
+    Raw pages are never modified: completed pages are copies. Page views (lazy extraction) only complete
+    the properties actually read.
+    """
+
+    def __init__(self, manager: Any, max_workers: Optional[int] = None, max_entries: int = 10_000):
+        self.manager = manager
+        self.max_workers = max_workers or int(manager.concurrency.max_limit)
+        self.max_entries = max_entries
+        self.requests = 0
+        self._values = OrderedDict()
+        self._lock = threading.Lock()
+
+    def complete(self, pages: dict[str, Any] | Iterable[dict[str, Any]], property_ids: Optional[Iterable[str]] = None) -> dict[str, Any] | list[dict[str, Any]]:
+        """
+        Returns the raw pages (a page or a list, like the input) with truncated property values (or only those of
+        the given property IDs) replaced by their full value. Pages with a completed property are shallow copies
+        with copied properties, the others are returned as is. A property whose read fails keeps its truncated value.
+        """
+        single = isinstance(pages, dict)
+        pages = [pages] if single else list(pages)
+        property_ids = set(property_ids) if property_ids is not None else None
+        truncated = [
+            (page, name, property_data)
+            for page in pages if page.get('object') == 'page'
+            for name, property_data in page.get('properties', {}).items()
+            if _is_truncated(property_data) and (property_ids is None or property_data.get('id') in property_ids)
+        ]
+        if not truncated:
+            return pages[0] if single else pages
+
+        keys = [(page['id'], property_data['id'], page.get('last_edited_time')) for page, _, property_data in truncated]
+        missing = self._missing_keys(keys)
+        values = {}
+        if missing:
+            fetch_value = with_current_context(self._fetch_value)
+            with ThreadPoolExecutor(max_workers=min(self.max_workers, len(missing))) as executor:
+                fetched = list(executor.map(fetch_value, missing))
+            with self._lock:
+                self.requests += len(missing)
+            # A dry run only counts the requests: its synthetic values are neither cached nor returned
+            if current_plan() is not None:
+                return pages[0] if single else pages
+            values = {key: value for key, value in zip(missing, fetched) if value is not None}
+            self._store(values.items())
+
+        if current_plan() is not None:
+            return pages[0] if single else pages
+        with self._lock:
+            for key in keys:
+                if key not in values and key in self._values:
+                    values[key] = self._values[key]
+        completed = {}
+        for (page, name, property_data), key in zip(truncated, keys):
+            if key in values:
+                page_copy = completed.get(id(page))
+                if page_copy is None:
+                    page_copy = completed[id(page)] = {**page, 'properties': dict(page['properties'])}
+                page_copy['properties'][name] = {**property_data, property_data['type']: values[key], 'has_more': False}
+        pages = [completed.get(id(page), page) for page in pages]
+        return pages[0] if single else pages
+
+    def _missing_keys(self, keys: list[tuple[str, str, Any]]) -> list[tuple[str, str, Any]]:
+        """Returns the distinct keys whose value is not cached, and records the cache lookups in a dry-run plan."""
+        with self._lock:
+            missing = list(dict.fromkeys(key for key in keys if key not in self._values))
+            for key in keys:
+                if key in self._values:
+                    self._values.move_to_end(key)
+        plan = current_plan()
+        if plan is not None:
+            for key in keys:
+                plan.record_cache_lookup("property_item", key not in missing)
+        return missing
+
+    def _store(self, entries: Iterable[tuple[tuple[str, str, Any], list[Any]]]):
+        """Caches full values, dropping the least recently used ones beyond max_entries."""
+        with self._lock:
+            for key, value in entries:
+                self._values[key] = value
+            while len(self._values) > self.max_entries:
+                self._values.popitem(last=False)
+
+    def _fetch_value(self, key: tuple[str, str, Any]) -> Optional[list[Any]]:
+        """Reads every page of a property item list and rebuilds the value as found in page objects; None if the read fails."""
+        page_id, property_id, _ = key
+        url = PAGE_PROPERTY_URL_TEMPLATE.format(page_id=page_id, property_id=property_id)
+        try:
+            items = self.manager._fetch_paginated_data(url)
+        except Exception:
+            return None
+        return [item[item['type']] for item in items if item.get('type') in item]
+
+
+def _is_truncated(property_data: dict[str, Any]) -> bool:
+    """Tells whether a page object property may hold only the first items of its value."""
+    if property_data.get('type') not in PAGINATED_PROPERTY_TYPES:
+        return False
+    if 'has_more' in property_data:
+        return bool(property_data['has_more'])
+    value = property_data.get(property_data['type'])
+    return type(value) is list and len(value) >= PAGE_OBJECT_ITEM_LIMIT
+
+
+# Tests
+
+def test_complete_truncated_properties():
+    """Test completing the truncated properties of every card, then again from the cache."""
+    from constants import DATABASE_ID
+    from notion_manager import NotionPageManager
+
+    page_manager = NotionPageManager(DATABASE_ID)
+    pages = page_manager.query_database()
+    fetcher = PropertyItemFetcher(page_manager)
+    fetcher.complete(pages)
+    print(f"First pass: {fetcher.requests} properties read for {len(pages)} pages")
+    fetcher.complete(pages)
+    print(f"Second pass: {fetcher.requests} properties read in total")
+
+
+if __name__ == "__main__":
+    test_complete_truncated_properties()
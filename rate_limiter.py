@@ -0,0 +1,261 @@
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Optional
+
+# Notion allows an average of three requests per second per integration
+NOTION_REQUESTS_PER_SECOND = 3.0
+
+
+class TokenBucketRateLimiter:
+    """
+    Thread-safe token bucket shared by every request of a NotionManager.
+    Tokens are refilled at 'rate' per second up to 'capacity', acquire() blocks until one is available.
+    """
+
+    def __init__(self, rate: float = NOTION_REQUESTS_PER_SECOND, capacity: float = NOTION_REQUESTS_PER_SECOND):
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = capacity
+        self._updated_at = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self, tokens: float = 1):
+        """Blocks until 'tokens' tokens are available, then consumes them."""
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated_at) * self.rate)
+                self._updated_at = now
+                if self._tokens >= tokens:
+                    self._tokens -= tokens
+                    return
+                wait_time = (tokens - self._tokens) / self.rate
+            time.sleep(wait_time)
+
+
+class SharedRateLimiter:
+    """
+    Token bucket shared by every process of the host, stored in a SQLite database (WAL mode).
+
+    Processes using the same integration token point to the same database file, so together they never
+    exceed 'rate' requests per second. Waiting requests register in a queue and each available token goes
+    to the waiting process that consumed the least recently (exponentially decayed usage), then to the
+    oldest request, so a busy background sync cannot starve an occasional admin action.
+    Per-process consumption is reported by usage().
+    """
+
+    USAGE_HALF_LIFE = 10.0
+    STALE_WAITER_SECONDS = 30.0
+    POLL_INTERVAL = 0.02
+
+    def __init__(self, path: str, rate: float = NOTION_REQUESTS_PER_SECOND, capacity: float = NOTION_REQUESTS_PER_SECOND, process_name: Optional[str] = None):
+        self.path = path
+        self.rate = rate
+        self.capacity = capacity
+        self.process_name = process_name or f"pid-{os.getpid()}"
+        self._local = threading.local()
+        self._setup()
+
+    def _connect(self) -> sqlite3.Connection:
+        """Returns the SQLite connection of the current thread."""
+        connection = getattr(self._local, 'connection', None)
+        if connection is None:
+            connection = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            self._local.connection = connection
+        return connection
+
+    def _setup(self):
+        """Creates the bucket, waiter and usage tables."""
+        connection = self._connect()
+        connection.execute("BEGIN IMMEDIATE")
+        connection.execute("CREATE TABLE IF NOT EXISTS bucket (id INTEGER PRIMARY KEY CHECK (id = 1), tokens REAL, updated_at REAL)")
+        connection.execute("CREATE TABLE IF NOT EXISTS waiters (ticket INTEGER PRIMARY KEY AUTOINCREMENT, process TEXT, heartbeat REAL)")
+        connection.execute("CREATE TABLE IF NOT EXISTS usage (process TEXT PRIMARY KEY, granted INTEGER, recent REAL, updated_at REAL)")
+        connection.execute("INSERT OR IGNORE INTO bucket (id, tokens, updated_at) VALUES (1, ?, ?)", (self.capacity, time.time()))
+        connection.execute("COMMIT")
+
+    def acquire(self, tokens: float = 1):
+        """Blocks until this process is granted 'tokens' tokens from the shared bucket."""
+        connection = self._connect()
+        ticket = connection.execute(
+            "INSERT INTO waiters (process, heartbeat) VALUES (?, ?)", (self.process_name, time.time())
+        ).lastrowid
+        try:
+            while True:
+                wait_time = self._try_acquire(connection, ticket, tokens)
+                if wait_time is None:
+                    return
+                time.sleep(max(wait_time, self.POLL_INTERVAL))
+        except BaseException:
+            connection.execute("DELETE FROM waiters WHERE ticket = ?", (ticket,))
+            raise
+
+    def _try_acquire(self, connection: sqlite3.Connection, ticket: int, tokens: float) -> Optional[float]:
+        """
+        Grants the tokens if they are available and it is this request's turn, otherwise returns the time to wait.
+        Runs in one transaction, rolled back if anything fails so the bucket, waiters and usage stay consistent.
+        """
+        connection.execute("BEGIN IMMEDIATE")
+        try:
+            wait_time = self._grant(connection, ticket, tokens, time.time())
+        except BaseException:
+            connection.execute("ROLLBACK")
+            raise
+        connection.execute("COMMIT")
+        return wait_time
+
+    def _grant(self, connection: sqlite3.Connection, ticket: int, tokens: float, now: float) -> Optional[float]:
+        """Grants the tokens or returns the time to wait, inside the transaction of _try_acquire."""
+        refreshed = connection.execute("UPDATE waiters SET heartbeat = ? WHERE ticket = ?", (now, ticket)).rowcount
+        if not refreshed:
+            # Another process swept this waiter as stale (e.g. it slept too long): register it again, keeping its turn
+            connection.execute(
+                "INSERT INTO waiters (ticket, process, heartbeat) VALUES (?, ?, ?)", (ticket, self.process_name, now)
+            )
+        connection.execute("DELETE FROM waiters WHERE heartbeat < ?", (now - self.STALE_WAITER_SECONDS,))
+
+        available, updated_at = connection.execute("SELECT tokens, updated_at FROM bucket WHERE id = 1").fetchone()
+        available = min(self.capacity, available + max(0.0, now - updated_at) * self.rate)
+        connection.execute("UPDATE bucket SET tokens = ?, updated_at = ? WHERE id = 1", (available, now))
+        if available < tokens:
+            return (tokens - available) / self.rate
+
+        next_ticket = self._next_ticket(connection, now)
+        if next_ticket != ticket:
+            # This token goes to another waiter: sleep until the next one is refilled instead of polling
+            return (2 * tokens - available) / self.rate
+
+        connection.execute("UPDATE bucket SET tokens = ? WHERE id = 1", (available - tokens,))
+        connection.execute("DELETE FROM waiters WHERE ticket = ?", (ticket,))
+        connection.execute(
+            """
+            INSERT INTO usage (process, granted, recent, updated_at) VALUES (?, 1, 1, ?)
+            ON CONFLICT(process) DO UPDATE SET
+                granted = granted + 1,
+                recent = recent * ? + 1,
+                updated_at = excluded.updated_at
+            """,
+            (self.process_name, now, self._decay(connection, now)),
+        )
+        return None
+
+    def _next_ticket(self, connection: sqlite3.Connection, now: float) -> Optional[int]:
+        """Returns the ticket served next: oldest request of the waiting process with the lowest recent usage."""
+        waiters = connection.execute(
+            """
+            SELECT waiters.ticket, waiters.process, usage.recent, usage.updated_at
+            FROM waiters LEFT JOIN usage ON usage.process = waiters.process
+            ORDER BY waiters.ticket
+            """
+        ).fetchall()
+        best_ticket, best_usage = None, None
+        for ticket, _, recent, updated_at in waiters:
+            decayed_usage = (recent or 0.0) * 0.5 ** ((now - (updated_at or now)) / self.USAGE_HALF_LIFE)
+            if best_usage is None or decayed_usage < best_usage:
+                best_ticket, best_usage = ticket, decayed_usage
+        return best_ticket
+
+    def _decay(self, connection: sqlite3.Connection, now: float) -> float:
+        """Returns the decay factor to apply to this process' recent usage."""
+        row = connection.execute("SELECT updated_at FROM usage WHERE process = ?", (self.process_name,)).fetchone()
+        if row is None:
+            return 1.0
+        return 0.5 ** ((now - row[0]) / self.USAGE_HALF_LIFE)
+
+    def usage(self) -> list[dict[str, Any]]:
+        """Reports the tokens granted to each process."""
+        rows = self._connect().execute("SELECT process, granted, updated_at FROM usage ORDER BY granted DESC").fetchall()
+        return [{"process": process, "granted": granted, "last_request": updated_at} for process, granted, updated_at in rows]
+
+
+def default_rate_limiter() -> TokenBucketRateLimiter | SharedRateLimiter:
+    """
+    Returns the rate limiter used by NotionManager when none is given:
+    shared between processes when NOTION_RATE_LIMIT_DB points to a SQLite file, in-process otherwise.
+    """
+    path = os.environ.get("NOTION_RATE_LIMIT_DB")
+    if path:
+        return SharedRateLimiter(path, process_name=os.environ.get("NOTION_PROCESS_NAME"))
+    return TokenBucketRateLimiter()
+
+
+# Tests
+
+def _worker(path: str, process_name: str, requests_count: int):
+    """Consumes tokens from a shared limiter, as a worker process would before each request."""
+    rate_limiter = SharedRateLimiter(path, rate=10, capacity=1, process_name=process_name)
+    for _ in range(requests_count):
+        rate_limiter.acquire()
+
+
+def test_shared_rate_limiter():
+    """Test that several processes sharing a limiter stay under its rate and are all served."""
+    import multiprocessing
+    import tempfile
+
+    path = os.path.join(tempfile.mkdtemp(), "rate_limit.sqlite")
+    SharedRateLimiter(path, rate=10, capacity=1)
+    workers = [multiprocessing.Process(target=_worker, args=(path, f"worker-{index}", 10)) for index in range(3)]
+
+    start = time.monotonic()
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    elapsed = time.monotonic() - start
+
+    print(f"30 requests in {elapsed:.2f}s (expected about 3s at 10 req/s)")
+    print(SharedRateLimiter(path, rate=10, capacity=1).usage())
+
+
+def test_swept_waiter_is_served():
+    """Test that a live waiter deleted as stale by another process registers again and is still served."""
+    import tempfile
+
+    path = os.path.join(tempfile.mkdtemp(), "rate_limit.sqlite")
+    rate_limiter = SharedRateLimiter(path, rate=10, capacity=1)
+    rate_limiter.acquire()
+    original_try_acquire = rate_limiter._try_acquire
+
+    def try_acquire_after_sweep(connection, ticket, tokens):
+        # Simulates the sweep of another process while this one was stalled
+        connection.execute("DELETE FROM waiters WHERE ticket = ?", (ticket,))
+        return original_try_acquire(connection, ticket, tokens)
+
+    rate_limiter._try_acquire = try_acquire_after_sweep
+    start = time.monotonic()
+    rate_limiter.acquire()
+    assert time.monotonic() - start < 1, "the swept waiter was not served"
+    print(f"Swept waiter served after {time.monotonic() - start:.2f}s")
+
+
+
+def test_failed_grant_is_rolled_back():
+    """Test that a grant failing halfway leaves no token consumed and no waiter behind."""
+    import tempfile
+
+    path = os.path.join(tempfile.mkdtemp(), "rate_limit.sqlite")
+    rate_limiter = SharedRateLimiter(path, rate=10, capacity=1)
+
+    def failing_decay(connection, now):
+        raise sqlite3.OperationalError("disk I/O error")
+
+    rate_limiter._decay = failing_decay
+    try:
+        rate_limiter.acquire()
+    except sqlite3.OperationalError:
+        pass
+    connection = rate_limiter._connect()
+    tokens = connection.execute("SELECT tokens FROM bucket WHERE id = 1").fetchone()[0]
+    assert tokens == 1 and connection.execute("SELECT COUNT(*) FROM waiters").fetchone()[0] == 0
+    print("Failed grant rolled back")
+
+
+if __name__ == "__main__":
+    test_shared_rate_limiter()
+    test_swept_waiter_is_served()
+    test_failed_grant_is_rolled_back()
@@ -0,0 +1,173 @@
+import re
+import sys
+import tracemalloc
+import unicodedata
+from typing import Any, Optional
+
+from constants import NotionBasePropertyID, NotionCommentPropertyID, NotionDatabasePropertyID, NotionPagePropertyID, properties as SAMPLE_PROPERTIES
+from utils import _extract_database_property_value, _find_property
+
+# Python types of extracted values, per Notion property type (see utils._extract_property)
+NOTION_TYPE_ANNOTATIONS = {
+    'title': str,
+    'rich_text': str,
+    'select': str,
+    'multi_select': list[str],
+    'checkbox': bool,
+    'date': str,
+    'number': float,
+    'url': str,
+    'email': str,
+    'phone_number': str,
+    'people': list[str],
+    'files': list[str],
+    'relation': list[str],
+    'status': str,
+}
+
+
+class _Record:
+    """
+    Base class of the generated record classes.
+    Subclasses define __slots__ and _props, the property (enum member or name) stored in each slot.
+    """
+
+    __slots__ = ()
+    _props: tuple = ()
+    _slot_by_prop: dict = {}
+
+    def __init__(self, *values: Any):
+        for slot, value in zip(self.__slots__, values):
+            object.__setattr__(self, slot, value)
+        for slot in self.__slots__[len(values):]:
+            object.__setattr__(self, slot, None)
+
+    @classmethod
+    def from_dict(cls, interpreted_properties: dict[Any, Any]) -> "_Record":
+        """Builds a record from an extracted dictionary keyed by property."""
+        return cls(*(interpreted_properties.get(prop) for prop in cls._props))
+
+    def get(self, prop: Any, default: Any = None) -> Any:
+        """Returns the value stored for a property (enum member or property name), like dict.get."""
+        slot = self._slot_by_prop.get(prop)
+        if slot is None:
+            return default
+        value = getattr(self, slot)
+        return default if value is None else value
+
+    def to_dict(self) -> dict[Any, Any]:
+        """Converts the record back to an extracted dictionary keyed by property."""
+        return {prop: getattr(self, slot) for prop, slot in zip(self._props, self.__slots__)}
+
+    def __eq__(self, other: Any) -> bool:
+        if type(other) is not type(self):
+            return NotImplemented
+        return all(getattr(self, slot) == getattr(other, slot) for slot in self.__slots__)
+
+    def __repr__(self) -> str:
+        fields = ", ".join(f"{slot}={getattr(self, slot)!r}" for slot in self.__slots__)
+        return f"{type(self).__name__}({fields})"
+
+
+def _make_record_class(class_name: str, fields: list[tuple[str, Any, Any]], namespace: Optional[dict[str, Any]] = None) -> type:
+    """Creates a _Record subclass from (slot name, property, annotation) tuples."""
+    slots = tuple(slot for slot, _, _ in fields)
+    props = tuple(prop for _, prop, _ in fields)
+    class_namespace = {
+        '__slots__': slots,
+        '__annotations__': {slot: Optional[annotation] for slot, _, annotation in fields},
+        '_props': props,
+        '_slot_by_prop': dict(zip(props, slots)),
+    }
+    class_namespace.update(namespace or {})
+    return type(class_name, (_Record,), class_namespace)
+
+
+def _base_fields(*enums: Any) -> list[tuple[str, Any, Any]]:
+    """Returns one record field per member of the given property enums."""
+    return [(prop.name.lower(), prop, Any) for enum in enums for prop in enum]
+
+
+def _field_name(property_name: str, used_names: set[str]) -> str:
+    """Converts a Notion property name ("Date d’échéance") into a unique identifier ("date_d_echeance")."""
+    ascii_name = unicodedata.normalize('NFKD', property_name).encode('ascii', 'ignore').decode()
+    name = re.sub(r'\W+', '_', ascii_name).strip('_').lower() or "property"
+    if name[0].isdigit():
+        name = f"p_{name}"
+    unique_name, suffix = name, 2
+    while unique_name in used_names:
+        unique_name, suffix = f"{name}_{suffix}", suffix + 1
+    return unique_name
+
+
+def build_page_record_class(db_properties: dict[str, Any], class_name: str = "PageRecord") -> type:
+    """
+    Generates a record class with __slots__ from a database schema (see NotionManager.fetch_db_properties).
+    The class has one field per base/page property and one per database property, annotated with
+    the Python type extracted for its Notion type. Properties listed in NotionDatabasePropertyID are
+    keyed by their enum member and named after it, the others are keyed by their property name.
+    """
+    fields = _base_fields(NotionBasePropertyID, NotionPagePropertyID)
+    used_names = {slot for slot, _, _ in fields}
+    known_props = {prop.value: prop for prop in NotionDatabasePropertyID}
+    property_names = []
+
+    for property_name, details in db_properties.items():
+        known_prop = known_props.get(details['id'])
+        if known_prop is not None:
+            prop, slot = known_prop, _field_name(known_prop.name, used_names)
+        else:
+            prop, slot = property_name, _field_name(property_name, used_names)
+        used_names.add(slot)
+        fields.append((slot, prop, NOTION_TYPE_ANNOTATIONS.get(details.get('type'), Any)))
+        property_names.append((property_name, details['id']))
+
+    base_props = tuple(prop.value for prop in (*NotionBasePropertyID, *NotionPagePropertyID))
+    property_names = tuple(property_names)
+
+    def from_page(cls, page_data: dict[str, Any], for_display: bool = False, interner: Any = None,
+                  relation_titles: Optional[dict[str, str]] = None, pack_uuids: bool = False) -> "_Record":
+        """
+        Extracts a raw Notion page directly into a record, interning values with the optional StringInterner.
+        For display, related pages are shown by their title in relation_titles.
+        With an interner and pack_uuids=True, UUID values of database properties (people, relations, option IDs)
+        are stored as 16 bytes (see interning.unpack_uuid); base properties such as the page ID stay strings.
+        """
+        properties_data = page_data.get('properties', {})
+        values = [page_data.get(key) for key in base_props]
+        for property_name, property_id in property_names:
+            property_data = _find_property(properties_data, property_name, property_id)
+            value = _extract_database_property_value(property_data, for_display, relation_titles) if property_data else None
+            values.append(interner.intern_value(value, pack_uuids) if interner else value)
+        return cls(*values)
+
+    return _make_record_class(class_name, fields, {'from_page': classmethod(from_page)})
+
+
+CommentRecord = _make_record_class("CommentRecord", _base_fields(NotionBasePropertyID, NotionCommentPropertyID))
+
+
+# Benchmarks
+
+def benchmark_record_memory(count: int = 100_000):
+    """Compare the memory held by extracted dictionaries and records for synthetic pages."""
+    from notion_manager import NotionPageManager
+
+    page_manager = NotionPageManager("benchmark", db_properties=SAMPLE_PROPERTIES)
+    pages = [
+        {'object': 'page', 'id': f"{i:032x}", 'archived': False, 'properties': SAMPLE_PROPERTIES}
+        for i in range(count)
+    ]
+
+    for as_records in (False, True):
+        tracemalloc.start()
+        extracted = page_manager.extract_data(pages, as_records=as_records)
+        size, _ = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        label = "records" if as_records else "dicts"
+        print(f"{label:8}: {size / 1024 / 1024:8.1f} MiB for {len(extracted)} pages")
+        del extracted
+
+
+if __name__ == "__main__":
+    benchmark_record_memory(int(sys.argv[1]) if len(sys.argv) > 1 else 100_000)
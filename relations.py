@@ -0,0 +1,120 @@
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Iterable, Optional
+
+from constants import PAGE_URL_TEMPLATE
+from planner import current_plan
+from scheduler import with_current_context
+from utils import _extract_page_title
+
+# Notion gives the title property of every database the ID 'title'
+TITLE_PROPERTY_ID = "title"
+
+
+class RelationResolver:
+    """
+    Resolves the titles of related pages for display.
+
+    Relation values only carry page IDs. The resolver collects the related IDs of a whole batch of raw
+    pages, dedupes them, fetches the titles it does not know yet concurrently (requesting only the title
+    property), and returns the titles of the batch, which the relation extractor displays in place of the
+    IDs. Raw pages are left untouched. Titles are cached (up to max_entries, least recently used first
+    out), so displaying 1,000 cards costs one request per distinct related page. Failed lookups (pages
+    the integration cannot read, throttling, an open circuit) are not cached and are retried next time.
+    """
+
+    def __init__(self, manager: Any, max_workers: Optional[int] = None, max_entries: int = 10_000):
+        self.manager = manager
+        self.max_workers = max_workers or int(manager.concurrency.max_limit)
+        self.max_entries = max_entries
+        self.requests = 0
+        self._titles = OrderedDict()
+        self._lock = threading.Lock()
+
+    def resolve(self, pages: dict[str, Any] | Iterable[dict[str, Any]]) -> dict[str, str]:
+        """Returns the titles of the pages related to raw pages, by page ID, fetching the ones not cached."""
+        pages = [pages] if isinstance(pages, dict) else list(pages)
+        page_ids = {
+            entry['id']
+            for page in pages if page.get('object') == 'page'
+            for property_data in page.get('properties', {}).values() if property_data.get('type') == 'relation'
+            for entry in property_data.get('relation') or []
+        }
+        if not page_ids:
+            return {}
+
+        missing = self._missing_ids(page_ids)
+        titles = {}
+        if missing:
+            fetch_title = with_current_context(self._fetch_title)
+            with ThreadPoolExecutor(max_workers=min(self.max_workers, len(missing))) as executor:
+                fetched = dict(zip(missing, executor.map(fetch_title, missing)))
+            titles = {page_id: title for page_id, title in fetched.items() if title is not None}
+            with self._lock:
+                self.requests += len(missing)
+                if current_plan() is None:
+                    self._titles.update(titles)
+                    while len(self._titles) > self.max_entries:
+                        self._titles.popitem(last=False)
+
+        with self._lock:
+            for page_id in page_ids:
+                if page_id not in titles and page_id in self._titles:
+                    titles[page_id] = self._titles[page_id]
+        return titles
+
+    def title(self, page_id: str) -> Optional[str]:
+        """Returns the title of a page, fetching it if it is not cached."""
+        return self.resolve([{'object': 'page', 'properties': {'relation': {'type': 'relation', 'relation': [{'id': page_id}]}}}]).get(page_id)
+
+    def invalidate(self, page_ids: Optional[Iterable[str]] = None):
+        """Forgets cached titles (all of them by default), e.g. after related pages were renamed."""
+        with self._lock:
+            if page_ids is None:
+                self._titles.clear()
+            for page_id in page_ids or ():
+                self._titles.pop(page_id, None)
+
+    def _missing_ids(self, page_ids: set[str]) -> list[str]:
+        """Returns the IDs whose title is not cached yet, and records the cache lookups in a dry-run plan."""
+        with self._lock:
+            missing = [page_id for page_id in page_ids if page_id not in self._titles]
+            for page_id in page_ids:
+                if page_id in self._titles:
+                    self._titles.move_to_end(page_id)
+        plan = current_plan()
+        if plan is not None:
+            for page_id in page_ids:
+                plan.record_cache_lookup("relation_title", page_id not in missing)
+        return missing
+
+    def _fetch_title(self, page_id: str) -> Optional[str]:
+        """Fetches only the title property of a page; None if the page cannot be read."""
+        url = PAGE_URL_TEMPLATE.format(page_id=page_id)
+        try:
+            page_data = self.manager.fetch_url(url, {"filter_properties": [TITLE_PROPERTY_ID]})
+        except Exception:
+            return None
+        return _extract_page_title(page_data)
+
+
+# Tests
+
+def test_resolve_relations():
+    """Test resolving the relations of every card with one request per distinct related page."""
+    from constants import DATABASE_ID
+    from notion_manager import NotionPageManager
+
+    page_manager = NotionPageManager(DATABASE_ID)
+    pages = page_manager.query_database()
+    resolver = RelationResolver(page_manager)
+    titles = resolver.resolve(pages)
+    first_requests = resolver.requests
+    print(f"First resolve: {first_requests} requests for {len(titles)} related pages of {len(pages)} pages")
+    resolver.resolve(pages)
+    print(f"Second resolve: {resolver.requests - first_requests} more requests")
+
+
+if __name__ == "__main__":
+    test_resolve_relations()
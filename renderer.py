@@ -0,0 +1,128 @@
+import csv
+import io
+import json
+import sys
+from itertools import chain
+from typing import Any, Iterable, Optional, TextIO
+
+from constants import NotionBasePropertyDisplayName, NotionBasePropertyID, NotionCommentPropertyDisplayName, NotionCommentPropertyID, NotionDatabasePropertyDisplayName, NotionDatabasePropertyID
+from interning import unpack_uuid
+
+FORMATS = ("table", "jsonl", "csv")
+
+# Columns (property, header) per object type, computed once
+PAGE_COLUMNS = [(NotionBasePropertyID.ID, NotionBasePropertyDisplayName.ID.value)] + [
+    (prop, NotionDatabasePropertyDisplayName[prop.name].value) for prop in NotionDatabasePropertyID
+]
+COMMENT_COLUMNS = [(NotionBasePropertyID.ID, NotionBasePropertyDisplayName.ID.value)] + [
+    (prop, NotionCommentPropertyDisplayName[prop.name].value) for prop in NotionCommentPropertyID
+]
+
+
+class DataRenderer:
+    """
+    Renders extracted pages or comments as an aligned table, JSON Lines or CSV.
+
+    Headers are computed once, items are consumed one by one from any iterable (including generators)
+    and rows are written to the stream in chunks, so large listings are rendered in constant memory
+    with few write calls. Table columns have a fixed width (longer values are truncated and line breaks
+    are collapsed to spaces) because column widths cannot be known before the last row in a streaming render.
+    """
+
+    def __init__(self, format: str = "table", stream: Optional[TextIO] = None, chunk_size: int = 1000, column_width: int = 24):
+        if format not in FORMATS:
+            raise ValueError(f"Unsupported format: {format}. Expected one of {FORMATS}")
+        self.format = format
+        self.stream = stream or sys.stdout
+        self.chunk_size = chunk_size
+        self.column_width = column_width
+        self._csv_line = io.StringIO()
+        self._csv_writer = csv.writer(self._csv_line)
+
+    def render(self, extracted_data: Iterable[Any], columns: Optional[list[tuple[Any, str]]] = None, header: bool = True) -> int:
+        """
+        Renders extracted items (dicts, PageView or records) and returns the number of rows written.
+        Columns default to the page or comment columns, depending on the first item.
+        With header=False, the table/CSV header is skipped (e.g. when appending to an existing output).
+        """
+        items = iter(extracted_data)
+        first_item = next(items, None)
+        if first_item is None:
+            return 0
+        if columns is None:
+            columns = COMMENT_COLUMNS if first_item.get(NotionBasePropertyID.OBJECT) == 'comment' else PAGE_COLUMNS
+
+        format_row = getattr(self, f"_format_{self.format}_row")
+        props = [prop for prop, _ in columns]
+        headers = [header for _, header in columns]
+
+        buffer = []
+        header_line = self._format_header(headers) if header else None
+        if header_line:
+            buffer.append(header_line)
+
+        count = 0
+        for item in chain((first_item,), items):
+            buffer.append(format_row([item.get(prop) for prop in props], headers))
+            count += 1
+            if len(buffer) >= self.chunk_size:
+                self.stream.write("".join(buffer))
+                buffer.clear()
+
+        self.stream.write("".join(buffer))
+        self.stream.flush()
+        return count
+
+    # Formats
+
+    def _format_header(self, headers: list[str]) -> Optional[str]:
+        """Formats the header line of the table and CSV formats."""
+        if self.format == "table":
+            line = self._format_table_row(headers, headers)
+            return line + "-" * (len(line) - 1) + "\n"
+        if self.format == "csv":
+            return self._format_csv_row(headers, headers)
+        return None
+
+    def _format_table_row(self, values: list[Any], headers: list[str]) -> str:
+        """Formats a row of fixed-width columns."""
+        width = self.column_width
+        cells = []
+        for value in values:
+            text = _to_text(value)
+            if not text.isprintable():
+                # Newlines and tabs (rich text, descriptions) would break the row layout
+                text = " ".join(text.split())
+            if len(text) > width:
+                text = text[:width - 1] + "…"
+            cells.append(f"{text:{width}}")
+        return " | ".join(cells).rstrip() + "\n"
+
+    def _format_jsonl_row(self, values: list[Any], headers: list[str]) -> str:
+        """Formats a row as a JSON object keyed by header."""
+        return json.dumps(dict(zip(headers, values)), ensure_ascii=False, default=_json_default) + "\n"
+
+    def _format_csv_row(self, values: list[Any], headers: list[str]) -> str:
+        """Formats a row as a CSV line."""
+        self._csv_line.seek(0)
+        self._csv_line.truncate()
+        self._csv_writer.writerow([_to_text(value) for value in values])
+        return self._csv_line.getvalue()
+
+
+def _to_text(value: Any) -> str:
+    """Converts an extracted value to a single line of text."""
+    if value is None:
+        return ""
+    if type(value) is list:
+        return ", ".join(_to_text(item) for item in value)
+    if type(value) is bytes:
+        return unpack_uuid(value)
+    return str(value)
+
+
+def _json_default(value: Any) -> Any:
+    """Serializes values json does not support (packed UUIDs, dates, enums)."""
+    if type(value) is bytes:
+        return unpack_uuid(value)
+    return str(value)
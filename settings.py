@@ -0,0 +1,18 @@
+"""
+Settings added to constants.example.py after users made their own constants.py from it.
+
+An existing constants.py lacks these names, so they are read from it when present and default to the
+values of constants.example.py otherwise: upgrading never requires editing constants.py.
+"""
+import constants
+from constants import NotionBasePropertyID
+
+BASE_URL = getattr(constants, "BASE_URL", "https://api.notion.com/v1")
+
+DATABASE_QUERY_URL_TEMPLATE = getattr(constants, "DATABASE_QUERY_URL_TEMPLATE", f"{BASE_URL}/databases/{{database_id}}/query")
+PAGE_PROPERTY_URL_TEMPLATE = getattr(constants, "PAGE_PROPERTY_URL_TEMPLATE", f"{BASE_URL}/pages/{{page_id}}/properties/{{property_id}}")
+BLOCK_OBJECT_URL_TEMPLATE = getattr(constants, "BLOCK_OBJECT_URL_TEMPLATE", f"{BASE_URL}/blocks/{{block_id}}")
+SEARCH_URL = getattr(constants, "SEARCH_URL", f"{BASE_URL}/search")
+
+# Base property flagging pages in the trash; None when NotionBasePropertyID has no IN_TRASH member
+IN_TRASH_PROPERTY = getattr(NotionBasePropertyID, "IN_TRASH", None)
@@ -1,7 +1,24 @@
-from typing import Any
+from typing import Any, Optional
 from constants import NotionBasePropertyDisplayName, NotionBasePropertyID, NotionCommentPropertyDisplayName, NotionCommentPropertyID, NotionDatabasePropertyDisplayName, NotionDatabasePropertyID, NotionPagePropertyID
 
 
+def _map_property_ids_to_names(properties: dict[str, Any]) -> dict[str, str]:
+    """Maps property IDs to their names from a database 'properties' schema."""
+    return {details['id']: name for name, details in properties.items()}
+
+def _find_property(properties_data: dict[str, Any], property_name: Optional[str], property_id: str) -> Optional[dict[str, Any]]:
+    """
+    Returns the data of a page property by name, checked against its stable ID.
+    When the name is unknown or stale (the property was renamed), the property is found by ID in the payload.
+    """
+    property_data = properties_data.get(property_name) if property_name is not None else None
+    if property_data is not None and property_data.get('id') in (property_id, None):
+        return property_data
+    for candidate in properties_data.values():
+        if candidate.get('id') == property_id:
+            return candidate
+    return None
+
 def _extract_property_content(property_data: dict[str, Any]) -> Any:
     """Extracts the content for a given property type."""
     return property_data.get(property_data['type'], None)
@@ -10,8 +27,12 @@ def _extract_plain_text_from_rich_text(rich_text_array: list[dict[str, Any]]) ->
     """Extracts plain text from a list of rich text objects."""
     return ''.join(item.get('plain_text', '') for item in rich_text_array)
 
-def _extract_property(property_type: str, content: Any, for_display: bool = False) -> Any:
-    """Extracts content based on property type and whether it's for display."""
+def _extract_property(property_type: str, content: Any, for_display: bool = False, relation_titles: Optional[dict[str, str]] = None) -> Any:
+    """
+    Extracts content based on property type and whether it's for display.
+    For display, related pages are shown by their title in relation_titles (see relations.RelationResolver).
+    """
+    relation_titles = relation_titles or {}
     extractors = {
         'title': _extract_plain_text_from_rich_text,
         'rich_text': _extract_plain_text_from_rich_text,
@@ -25,7 +46,7 @@ def _extract_property(property_type: str, content: Any, for_display: bool = Fals
         'phone_number': lambda c: c,
         'people': lambda c: [p.get('name', 'Unknown') if for_display else p.get('id') for p in c],
         'files': lambda c: [f.get('name') for f in c],
-        'relation': lambda c: [r.get('name') if for_display else r.get('id') for r in c],
+        'relation': lambda c: [relation_titles.get(r.get('id'), r.get('name')) if for_display else r.get('id') for r in c],
         'status': lambda c: c.get('name') if for_display else c.get('id'),
         'emoji': lambda c: c.get('name') if for_display else c.get('id'),
         'formula': lambda c: c.get('name') if for_display else c.get('id'),
@@ -33,6 +54,20 @@ def _extract_property(property_type: str, content: Any, for_display: bool = Fals
     return extractors.get(property_type, lambda c: None)(content)
 
 
+def _extract_page_title(page_data: dict[str, Any]) -> str:
+    """Extracts the plain-text title of a page, whatever the name of its title property."""
+    for property_data in page_data.get('properties', {}).values():
+        if property_data.get('type') == 'title':
+            return _extract_plain_text_from_rich_text(property_data.get('title', []))
+    return ''
+
+
+def _extract_database_property_value(property_data: dict[str, Any], for_display: bool = False, relation_titles: Optional[dict[str, str]] = None) -> Any:
+    """Extracts the interpreted value of a single entry of page_data['properties']."""
+    content = _extract_property_content(property_data)
+    return _extract_property(property_data['type'], content, for_display, relation_titles)
+
+
 def _extract_data_base_properties(page_data: dict[str, Any]) -> dict[NotionBasePropertyID, Any]:
     """
     Extracts base properties from a Notion page.
@@ -61,45 +96,41 @@ def _extract_comment_text(comment_data: dict[str, Any], for_display: bool = Fals
     return _extract_plain_text_from_rich_text(rich_text)
 
 
-def display_page(interpreted_properties: dict[NotionPagePropertyID, Any], detailed: bool, separator: bool):
+# Display names, computed once instead of for every property of every item
+_PAGE_DISPLAY_NAMES = [(prop, NotionDatabasePropertyDisplayName[prop.name].value) for prop in NotionDatabasePropertyID]
+_COMMENT_DISPLAY_NAMES = [(prop, NotionCommentPropertyDisplayName[prop.name].value) for prop in NotionCommentPropertyID]
+
+def _format_item(title: str, interpreted_properties: dict[Any, Any], display_names: list[tuple[Any, str]], detailed: bool, separator: bool) -> str:
     """
-    Displays a page's properties in a formatted manner.
+    Formats a page or comment as a single block of text.
     """
     n = 60
     c = 20
     prefix = "* "
-    page_id = interpreted_properties.get(NotionBasePropertyID.ID, 'N/A')
-    print("\n" + "=" * n) if separator else ()
-    print(f"{'Page - ' + NotionBasePropertyDisplayName.ID.value:{c}}: {page_id}")
+    item_id = interpreted_properties.get(NotionBasePropertyID.ID, 'N/A')
+    lines = ["\n" + "=" * n] if separator else []
+    lines.append(f"{title + ' - ' + NotionBasePropertyDisplayName.ID.value:{c}}: {item_id}")
 
     if detailed:
-        print("\nDetailed Properties:\n" + "-" * n)
-        for prop in NotionDatabasePropertyID:
-            display_name = NotionDatabasePropertyDisplayName[prop.name].value
+        lines.append("\nDetailed Properties:\n" + "-" * n)
+        for prop, display_name in display_names:
             value = interpreted_properties.get(prop, 'N/A')
-            print(f"{(prefix + display_name):{c}}: {value}")
+            lines.append(f"{(prefix + display_name):{c}}: {value}")
+
+    lines.append("=" * n)
+    return "\n".join(lines)
 
-    print("=" * n)
+def display_page(interpreted_properties: dict[NotionPagePropertyID, Any], detailed: bool, separator: bool):
+    """
+    Displays a page's properties in a formatted manner.
+    """
+    print(_format_item("Page", interpreted_properties, _PAGE_DISPLAY_NAMES, detailed, separator))
 
 def display_comment(interpreted_properties: dict[str, Any], detailed: bool, separator: bool):
     """
     Displays a comment in a formatted manner.
     """
-    n = 60
-    c = 20
-    prefix = "* "
-    page_id = interpreted_properties.get(NotionBasePropertyID.ID, 'N/A')
-    print("\n" + "=" * n) if separator else ()
-    print(f"{'Comment - ' + NotionBasePropertyDisplayName.ID.value:{c}}: {page_id}")
-
-    if detailed:
-        print("\nDetailed Properties:\n" + "-" * n)
-        for prop in NotionCommentPropertyID:
-            display_name = NotionCommentPropertyDisplayName[prop.name].value
-            value = interpreted_properties.get(prop, 'N/A')
-            print(f"{(prefix + display_name):{c}}: {value}")
-    
-    print("=" * n)
+    print(_format_item("Comment", interpreted_properties, _COMMENT_DISPLAY_NAMES, detailed, separator))
 
 def _display_data_item(interpreted_data: dict[str, Any], detailed: bool, separator: bool = True):
     """